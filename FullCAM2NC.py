@@ -8,7 +8,7 @@ from affine import Affine
 
 from tools.parameter import (SPECIES_GEOMETRY, SSPS, FUTURE_DATA_YR_RANGES,
                              RES_FACTOR, SIM_LENGTH, HIST_SIM_YEAR_START, HIST_SIM_YEAR_END)
-from tools import get_downloading_coords
+from tools import get_downloading_coords, intersect_coords
 from tools.helpers.cache_manager import get_existing_downloads
 from tools.XML2Data import (
     export_to_geotiff_with_band_names, 
@@ -33,7 +33,7 @@ SCENARIOS = [('historical', hist_data_year_range, HIST_SIM_YEAR_START, HIST_SIM_
 
 # Get the RES coords
 RES_df = get_downloading_coords(resfactor=RES_FACTOR)
-RES_coords = RES_df.set_index(['x', 'y']).index.tolist()
+RES_coords = RES_df[['x', 'y']].to_numpy()
 
 
 # Build the output grid straight off the LUTO template. `get_downloading_coords` samples
@@ -87,7 +87,7 @@ def save_carbon_to_geotiff(specId, specCat, ssp, data_year_range, sim_year_start
 
     # Get CSV files to be processed into xarray
     _, _, existing_dfs = get_existing_downloads(specId, specCat, ssp, data_year_range, sim_year_start, sim_year_end)
-    carbon_coords = set(existing_dfs).intersection(set(RES_coords))
+    carbon_coords = intersect_coords(existing_dfs, RES_coords).tolist()
 
     if not carbon_coords:
         print(f"  No results found for specId={specId}, specCat={specCat}, {scenario} - skipping.")
@@ -147,7 +147,7 @@ for ssp, data_year_range, sim_year_start, sim_year_end in SCENARIOS:
 
 
 # # ---------------------- Get SiteInfo data ------------------------
-# siteInfo_coords = set(existing_siteinfo).intersection(set(RES_coords))
+# siteInfo_coords = intersect_coords(existing_siteinfo, RES_coords).tolist()
 
 # sample_lon, sample_lat  = next(iter(siteInfo_coords))
 # sample_template = get_siteinfo_data(sample_lon, sample_lat) * np.nan
@@ -184,7 +184,7 @@ for ssp, data_year_range, sim_year_start, sim_year_end in SCENARIOS:
 
 
 # # ---------------------- Get species data ------------------------
-# species_coords = set(existing_species).intersection(set(RES_coords))
+# species_coords = intersect_coords(existing_species, RES_coords).tolist()
 
 # sample_lon, sample_lat  = next(iter(species_coords))
 # species_template = get_species_data(sample_lon, sample_lat)  # Warm up cache
@@ -0,0 +1,130 @@
+"""
+Tests for tools/helpers/cache_manager.py.
+
+Run from the repository root with `python -m unittest discover tests`.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+
+# `tools/__init__.py` refuses to import without an API key; the tests never call the API
+os.environ.setdefault('FULLCAM_API_KEY', 'unused-by-tests')
+
+from tools.helpers.cache_manager import _get_index_dir, batch_remove_files, load_cache
+
+
+DF_BLOCK = 'df_148.16_-35.61_specId_8_specCat_Block_ssp_SSP245_InData_1970_2023_SIM_YR_2010_2100.csv'
+DF_BELT = 'df_148.16_-35.61_specId_8_specCat_Belt_ssp_SSP245_InData_1970_2023_SIM_YR_2010_2100.csv'
+SITEINFO = 'siteInfo_148.16_-35.61.xml'
+SPECIES = 'species_148.16_-35.61_specId_8.xml'
+
+
+class BatchRemoveFilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.downloaded_dir = f'{self.tmp_dir}/downloaded'
+        self.cache_file = f'{self.downloaded_dir}/successful_downloads.txt'
+        os.makedirs(self.downloaded_dir)
+
+        for filename in (DF_BLOCK, DF_BELT, SITEINFO, SPECIES):
+            open(f'{self.downloaded_dir}/{filename}', 'w').close()
+        with open(self.cache_file, 'w', encoding='utf-8') as f:
+            f.write(f'{DF_BLOCK}\n{DF_BELT}\n{SITEINFO}\n{SPECIES}\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        shutil.rmtree(f'{self.tmp_dir}_index', ignore_errors=True)
+
+    def _load(self, specCat):
+        with redirect_stdout(io.StringIO()):
+            return load_cache(8, specCat, 'SSP245', '1970_2023', 2010, 2100, self.cache_file)
+
+    def test_pattern_matching_index_shard_keeps_index(self):
+        before = self._load('Block')
+        index_dir = _get_index_dir(self.cache_file)
+        shards_before = sorted(os.listdir(index_dir))
+
+        # The pattern also names the df shard ('df_specId_8_specCat_Block_...bin') and the
+        #   species shard ('species_specId_8.bin') of the index
+        with redirect_stdout(io.StringIO()):
+            success_count, failure_count, _ = batch_remove_files(
+                ['specId_8_specCat_Block', 'specId_8'], directory=self.downloaded_dir, n_jobs=2
+            )
+
+        # Only the download files are removed; the cache file is left alone
+        self.assertEqual((success_count, failure_count), (3, 0))
+        self.assertEqual(
+            sorted(os.listdir(self.downloaded_dir)), [SITEINFO, 'successful_downloads.txt']
+        )
+
+        # The index is untouched and still answers with the same records
+        self.assertEqual(sorted(os.listdir(index_dir)), shards_before)
+        self.assertEqual(self._load('Block'), before)
+        self.assertEqual(before, ([(148.16, -35.61)],) * 3)
+
+    def test_nested_and_non_record_files_are_not_removed(self):
+        nested_dir = f'{self.downloaded_dir}/successful_downloads_index'
+        os.makedirs(nested_dir)
+        open(f'{nested_dir}/df_specId_8_specCat_Block.bin', 'w').close()
+        open(f'{self.downloaded_dir}/notes_specId_8.txt', 'w').close()
+
+        with redirect_stdout(io.StringIO()):
+            batch_remove_files('specId_8', directory=self.downloaded_dir, n_jobs=2)
+
+        self.assertTrue(os.path.exists(f'{nested_dir}/df_specId_8_specCat_Block.bin'))
+        self.assertTrue(os.path.exists(f'{self.downloaded_dir}/notes_specId_8.txt'))
+        self.assertFalse(os.path.exists(f'{self.downloaded_dir}/{SPECIES}'))
+
+
+    def test_empty_pattern_is_rejected(self):
+        for pattern in ([], '', ['specId_8', '']):
+            with self.assertRaises(ValueError):
+                batch_remove_files(pattern, directory=self.downloaded_dir, n_jobs=2)
+
+        # Nothing was removed
+        self.assertEqual(len(os.listdir(self.downloaded_dir)), 5)
+
+
+class LoadCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_file = f'{self.tmp_dir}/downloaded/successful_downloads.txt'
+        os.makedirs(os.path.dirname(self.cache_file))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        shutil.rmtree(f'{self.tmp_dir}/downloaded_index', ignore_errors=True)
+
+    def _write_siteinfo(self, lons, mode='w'):
+        with open(self.cache_file, mode, encoding='utf-8') as f:
+            f.writelines(f'siteInfo_{lon:.2f}_-35.61.xml\n' for lon in lons)
+
+    def _load_siteinfo(self):
+        with redirect_stdout(io.StringIO()):
+            return load_cache(8, 'Block', 'SSP245', '1970_2023', 2010, 2100, self.cache_file)[0]
+
+    def test_appended_records_are_indexed(self):
+        self._write_siteinfo(range(100))
+        self.assertEqual(len(self._load_siteinfo()), 100)
+        self._write_siteinfo(range(100, 150), mode='a')
+        self.assertEqual(len(self._load_siteinfo()), 150)
+
+    def test_replaced_larger_cache_is_reindexed(self):
+        self._write_siteinfo(range(100))
+        self._load_siteinfo()
+
+        # A rebuilt cache that is larger than the indexed one, with different leading records
+        self._write_siteinfo(range(1000, 1500))
+        siteinfo = self._load_siteinfo()
+        self.assertEqual(len(siteinfo), 500)
+        self.assertEqual(sorted(siteinfo), [(float(lon), -35.61) for lon in range(1000, 1500)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -6,29 +6,39 @@ import rioxarray as rio
 import plotnine as p9
 
 from pathlib import Path
-from tools import get_downloading_coords
-from tools.helpers.cache_manager import get_existing_downloads
+from tools.helpers.res_coords import get_res_coords
 
 # ===================== Configuration =====================
 
 # Resolution factor for downsampling (10 = 0.1° grid spacing)
 RES_factor = 10
-SPECIES_ID = 8          # Eucalyptus globulus
-SPECIES_CAT = 'Block'   # Block or Belt; need to confirm with individual species
 PLO_data_path = Path('N:/Data-Master/FullCAM/FullCAM_REST_API_GET_DATA_2025/data/processed/BB_PLO_OneKm')
-existing_siteinfo, existing_species, existing_dfs = get_existing_downloads(SPECIES_ID, SPECIES_CAT)
 
-# Get resfactored coords for downloading
-scrap_coords = get_downloading_coords(resfactor=RES_factor).set_index(['x', 'y']).index.tolist()
-res_coords = set(existing_siteinfo).intersection(set(scrap_coords))
-res_coords_x = xr.DataArray([coord[0] for coord in res_coords], dims=['cell']).astype('float32')
-res_coords_y = xr.DataArray([coord[1] for coord in res_coords], dims=['cell']).astype('float32')
-
-# Save the PLO_RES data if not already saved
-if not (PLO_data_path / f'siteinfo_PLO_RES_{RES_factor}.nc').exists():
-    siteinfo_PLO_Full = xr.open_dataset(PLO_data_path / 'siteinfo_PLO_RES.nc').compute()
-    siteinfo_PLO_RESed = siteinfo_PLO_Full.sel(x=res_coords_x, y=res_coords_y)
-    siteinfo_PLO_RESed.to_netcdf(PLO_data_path / f'siteinfo_PLO_RES_{RES_factor}.nc')
+# Get resfactored coords that have a downloaded siteInfo file
+res_coords_x, res_coords_y = get_res_coords(resfactor=RES_factor)
+res_coords_x = res_coords_x.astype('float32')
+res_coords_y = res_coords_y.astype('float32')
+
+# Save the PLO_RES data if not already saved for these cells; the cells are picked from the
+#   lazily opened file (on-disk chunks), so only the chunks holding them are read rather than
+#   the full grid. `compare_variable` pairs its cells with the restful data by position, so a
+#   saved file whose x/y differ from the current res coords (in value or order) is rebuilt.
+siteinfo_PLO_RES_path = PLO_data_path / f'siteinfo_PLO_RES_{RES_factor}.nc'
+
+def is_PLO_RES_current(path):
+    """True if the PLO_RES file at `path` exists and holds exactly the res coords, in order."""
+    if not path.exists():
+        return False
+    with xr.open_dataset(path) as saved:
+        return (
+            np.array_equal(saved['x'].values, res_coords_x.values)
+            and np.array_equal(saved['y'].values, res_coords_y.values)
+        )
+
+if not is_PLO_RES_current(siteinfo_PLO_RES_path):
+    siteinfo_PLO_Full = xr.open_dataset(PLO_data_path / 'siteinfo_PLO_RES.nc', chunks={})
+    siteinfo_PLO_RESed = siteinfo_PLO_Full.sel(x=res_coords_x, y=res_coords_y).compute()
+    siteinfo_PLO_RESed.to_netcdf(siteinfo_PLO_RES_path)
 
 
 # ===================== Helper Functions =====================
@@ -42,9 +52,10 @@ def compare_variable(
     point_size: float = 0.05
 ):
 
-    # Extract variable data
-    var_restfull = dataset_restfull[variable_name]
-    var_plo = dataset_plo[variable_name]
+    # Extract variable data; subsample the cells before flattening, so the dataframe
+    #   only ever holds the rows that get plotted (cell x year x month is multi-GB)
+    var_restfull = dataset_restfull[variable_name].isel(cell=slice(None, None, subsample))
+    var_plo = dataset_plo[variable_name].isel(cell=slice(None, None, subsample))
 
     # Merge and prepare data
     plot_data = xr.merge([
@@ -57,8 +68,8 @@ def compare_variable(
         p9.ggplot() +
         p9.geom_point(
             p9.aes(
-                x=plot_data['restfull'][::subsample],
-                y=plot_data['PLO'][::subsample]
+                x=plot_data['restfull'],
+                y=plot_data['PLO']
             ),
             alpha=alpha,
             size=point_size
@@ -71,8 +82,8 @@ def compare_variable(
 
 
 # ---------------------- Compare SiteInfo data ------------------------
-siteInfo_restfull = xr.open_dataset('data/processed/siteinfo_RES.nc').compute().sel(x=res_coords_x, y=res_coords_y, drop=True)
-siteInfo_PLO = xr.open_dataset(PLO_data_path / f'siteinfo_PLO_RES_{RES_factor}.nc').compute()
+siteInfo_restfull = xr.open_dataset('data/processed/siteinfo_RES.nc', chunks={}).sel(x=res_coords_x, y=res_coords_y, drop=True).compute()
+siteInfo_PLO = xr.open_dataset(siteinfo_PLO_RES_path).compute()
 
 # avgAirTemp
 fig_avgAirTemp = compare_variable(
@@ -1,6 +1,4 @@
 
-import os
-import re
 import requests
 import io
 import numpy as np
@@ -17,6 +15,7 @@ from tqdm.auto import tqdm
 from glob import glob
 
 from tools.XML2Data import parse_site_data
+from tools.parameter import CARBON_CSV_COORDS
 
 
 
@@ -242,22 +241,30 @@ data_ANUClim = xr.load_dataset("data/ANUClim/processed/ANUClim_to_FullCAM.nc")
 
 # Get downloaded carbon data CSV files; does not matter which species because SiteInfo is the same for all species
 FullCAM_retrive_dir ='data/processed/Compare_API_and_Assemble_Data_Simulations/download_csv'
-csv_files = [i for i in glob(f'{FullCAM_retrive_dir}/*.csv') if f'specId_8_specCat_Block' in i]
+csv_files = glob(f'{FullCAM_retrive_dir}/df_*_specId_8_specCat_Block_*.csv')
 data_FullCam = pd.DataFrame()
 
-data_compare = pd.DataFrame()
-for f in tqdm(csv_files):
+csv_coords = [CARBON_CSV_COORDS.search(f).groups() for f in csv_files]
+
+# Get ANUClim data at all lon/lat in one vectorised selection
+data_ANUClim_pts = data_ANUClim.sel(
+    x=xr.DataArray([float(lon) for lon, _ in csv_coords], dims='points'),
+    y=xr.DataArray([float(lat) for _, lat in csv_coords], dims='points'),
+    method='nearest'
+)
+
+data_compare_parts = []
+for i, (lon, lat) in enumerate(tqdm(csv_coords)):
     # Get Cache data
     #   The SiteInfo data for the FullCAM carbon df at lon/lat already downloaded
-    lon, lat  = re.findall(r'df_(-?\d+\.\d+)_(-?\d+\.\d+)_specId_', os.path.basename(f))[0]
     with open(f'downloaded/siteInfo_{lon}_{lat}.xml', 'r') as file:
         FullCAM_siteinfo = parse_site_data(file.read())[['avgAirTemp', 'openPanEvap', 'rainfall']]
         FullCAM_siteinfo = FullCAM_siteinfo.to_dataframe().reset_index()
         FullCAM_siteinfo[['x', 'y']] = float(lon), float(lat)
     # Get ANUClim data at the lon/lat
     ANUClim_pt = (
-        data_ANUClim
-        .sel(x=float(lon), y=float(lat), method='nearest')
+        data_ANUClim_pts
+        .isel(points=i)
         .to_dataframe()
         .reset_index()
     )
@@ -267,9 +274,13 @@ for f in tqdm(csv_files):
         FullCAM_siteinfo,
         ANUClim_pt,
         on=['year', 'month', 'x', 'y'],
+        how='inner',
+        validate='one_to_one',
         suffixes=('_FullCAM', '_ANUClim')
     )
-    data_compare = pd.concat([data_compare, merged], ignore_index=True)
+    data_compare_parts.append(merged)
+
+data_compare = pd.concat(data_compare_parts, ignore_index=True)
        
         
 
@@ -291,7 +302,7 @@ fig_1 = (
     + p9.theme_bw()
 )
 
-fig_1.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_SiteInfo_openPanEvap.svg', dpi=150)
+fig_1.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_SiteInfo_openPanEvap.png', dpi=200)
 
 
 # rainfull
@@ -306,7 +317,7 @@ fig_2 = (
     )
     + p9.theme_bw()
 )
-fig_2.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_SiteInfo_rainfall.svg', dpi=150)
+fig_2.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_SiteInfo_rainfall.png', dpi=200)
 
 
 # avgAirTemp
@@ -321,7 +332,7 @@ fig_3 = (
     )
     + p9.theme_bw()
 )
-fig_3.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_SiteInfo_avgAirTemp.svg', dpi=150)
+fig_3.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_SiteInfo_avgAirTemp.png', dpi=200)
 
 
 
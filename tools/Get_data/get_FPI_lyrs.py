@@ -13,6 +13,7 @@ from rioxarray import merge as rio_merge
 from tools import get_downloading_coords
 from tools.helpers.cache_manager import get_existing_downloads
 from tools.XML2Data import parse_site_data
+from tools.parameter import CARBON_CSV_COORDS
 
 
 # Config
@@ -40,12 +41,12 @@ def merge_arrays(arrays, year):
     return year, rio_merge.merge_arrays(arrays)
 
 
-# Load FPI tiffs
-tasks = []
-for dir in glob('data//FPI_lys/FPI_tiff/*fpi_7022'):
-    for tif in glob(os.path.join(dir, '*.tif')):
-        year = re.search(r'(\d{4})_001.tif', tif).group(1)
-        tasks.append(delayed(load_tif_year)(tif, year))
+# Load FPI tiffs; the year is parsed from each filename with one precompiled pattern
+FPI_TIF_YEAR = re.compile(r'(\d{4})_001\.tif')
+tasks = [
+    delayed(load_tif_year)(tif, FPI_TIF_YEAR.search(tif).group(1))
+    for tif in glob(os.path.join('data//FPI_lys/FPI_tiff/*fpi_7022', '*.tif'))
+]
 
 FPI_lyrs = {}
 for year, data in tqdm(Parallel(n_jobs=16, return_as='generator_unordered')(tasks), total=len(tasks)):
@@ -79,21 +80,29 @@ FPI_DCCEEW = xr.load_dataset('data/FPI_lys/FPI_lyrs.nc')['data']
 
 # Get downloaded carbon data CSV files; does not matter which species because SiteInfo is the same for all species
 FullCAM_retrive_dir ='data/processed/Compare_API_and_Assemble_Data_Simulations/download_csv'
-csv_files = [i for i in glob(f'{FullCAM_retrive_dir}/*.csv') if f'specId_8_specCat_Block' in i]
+csv_files = glob(f'{FullCAM_retrive_dir}/df_*_specId_8_specCat_Block_*.csv')
+
+csv_coords = [CARBON_CSV_COORDS.search(f).groups() for f in csv_files]
 
-data_compare = pd.DataFrame()
-for f in tqdm(csv_files):
+# Get FPI from DCCEEW at all lon/lat in one vectorised selection
+FPI_DCCEEW_pts = FPI_DCCEEW.sel(
+    x=xr.DataArray([float(lon) for lon, _ in csv_coords], dims='points'),
+    y=xr.DataArray([float(lat) for _, lat in csv_coords], dims='points'),
+    method='nearest'
+)
+
+data_compare_parts = []
+for i, (lon, lat) in enumerate(tqdm(csv_coords)):
     # Get Cache data
     #   The SiteInfo data for the FullCAM carbon df at lon/lat already downloaded
-    lon, lat  = re.findall(r'df_(-?\d+\.\d+)_(-?\d+\.\d+)_specId_', os.path.basename(f))[0]
     with open(f'downloaded/siteInfo_{lon}_{lat}.xml', 'r') as file:
         FullCAM_siteinfo = parse_site_data(file.read())['forestProdIx']
         FullCAM_siteinfo = FullCAM_siteinfo.to_dataframe().reset_index()
         FullCAM_siteinfo[['x', 'y']] = float(lon), float(lat)
     # Get FPI from DCCEEW at the lon/lat
     FPI_pt = (
-        FPI_DCCEEW
-        .sel(x=float(lon), y=float(lat), method='nearest')
+        FPI_DCCEEW_pts
+        .isel(points=i)
         .to_dataframe()
         .reset_index()
         .rename(columns={'data':'forestProdIx'})
@@ -104,9 +113,13 @@ for f in tqdm(csv_files):
         FullCAM_siteinfo,
         FPI_pt,
         on=['year', 'x', 'y'],
+        how='inner',
+        validate='one_to_one',
         suffixes=('_FullCAM', '_DCCEEW')
     )
-    data_compare = pd.concat([data_compare, FPI_merged], ignore_index=True)
+    data_compare_parts.append(FPI_merged)
+
+data_compare = pd.concat(data_compare_parts, ignore_index=True)
     
 
 
@@ -127,4 +140,4 @@ fig = (
     )
 )
 
-fig.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_SiteInfo_FPI.svg', dpi=150)
+fig.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_SiteInfo_FPI.png', dpi=200)
@@ -1,6 +1,4 @@
 
-import os
-import re
 import pandas as pd
 import rioxarray as rio
 import xarray as xr
@@ -9,9 +7,11 @@ import plotnine as p9
 
 from glob import glob
 from tqdm.auto import tqdm
+from joblib import Parallel, delayed
 
 from pathlib import Path
 from tools.XML2Data import parse_soil_data
+from tools.parameter import CARBON_CSV_COORDS
 from tools.helpers.cache_manager import get_existing_downloads
 
 
@@ -79,30 +79,34 @@ soilClay_SLGA = rio.open_rasterio('data/Soil_landscape_AUS/ClayContent/clayFrac_
 
 # Get downloaded carbon data CSV files; does not matter which species because SiteInfo is the same for all species
 FullCAM_retrive_dir ='data/processed/Compare_API_and_Assemble_Data_Simulations/download_csv'
-csv_files = [i for i in glob(f'{FullCAM_retrive_dir}/*.csv') if f'specId_8_specCat_Block' in i]
+csv_files = glob(f'{FullCAM_retrive_dir}/df_*_specId_8_specCat_Block_*.csv')
 
-data_compare = pd.DataFrame()
-for f in tqdm(csv_files):
-    # Get Cache data
-    #   The SiteInfo data for the FullCAM carbon df at lon/lat already downloaded
-    lon, lat  = re.findall(r'df_(-?\d+\.\d+)_(-?\d+\.\d+)_specId_', os.path.basename(f))[0]
+csv_coords = [CARBON_CSV_COORDS.search(f).groups() for f in csv_files]
+
+# Get SoilClay from SLGA at all lon/lat in one vectorised selection
+soilClay_pts = soilClay_SLGA.sel(
+    x=xr.DataArray([float(lon) for lon, _ in csv_coords], dims='points'),
+    y=xr.DataArray([float(lat) for _, lat in csv_coords], dims='points'),
+    method='nearest'
+).values
+
+def get_FullCAM_soilClay(lon, lat):
+    """clayFrac from the SiteInfo data already downloaded for the FullCAM carbon df at lon/lat."""
     with open(f'downloaded/siteInfo_{lon}_{lat}.xml', 'r') as file:
-        FullCAM_soil = parse_soil_data(file.read())['clayFrac'].data.item()
-    # Get SoilClay from SLGA at the lon/lat
-    soilClay_pt = (
-        soilClay_SLGA
-        .sel(x=float(lon), y=float(lat), method='nearest')
-        .data
-        .item()
-    )
-    # Merge FullCAM and SLGA SoilClay data, then append to main dataframe
-    soilClay_merged = pd.DataFrame({
-        'soilClay_FullCAM': [FullCAM_soil],
-        'soilClay_SLGA': [soilClay_pt],
-        'x': [float(lon)],
-        'y': [float(lat)],
-    })
-    data_compare = pd.concat([data_compare, soilClay_merged], ignore_index=True)
+        return parse_soil_data(file.read())['clayFrac'].data.item()
+
+# The SiteInfo files are read and parsed independently, so run them in parallel. Parsing the
+#   XML is CPU work that holds the GIL, so the points are spread over processes (loky)
+#   rather than threads; joblib batches the small tasks to keep the dispatch cheap
+tasks = [delayed(get_FullCAM_soilClay)(lon, lat) for lon, lat in csv_coords]
+soilClay_FullCAM = list(tqdm(Parallel(n_jobs=-1, backend='loky', return_as='generator')(tasks), total=len(tasks)))
+
+data_compare = pd.DataFrame({
+    'soilClay_FullCAM': soilClay_FullCAM,
+    'soilClay_SLGA': soilClay_pts,
+    'x': [float(lon) for lon, _ in csv_coords],
+    'y': [float(lat) for _, lat in csv_coords],
+})
     
 
 # Plot comparison
@@ -122,4 +126,4 @@ fig = (
     )
 )
 
-fig.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_SiteInfo_soilClay.svg', dpi=150)
+fig.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_SiteInfo_soilClay.png', dpi=200)
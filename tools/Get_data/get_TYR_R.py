@@ -1,6 +1,4 @@
 
-import re
-import os
 import numpy as np
 import rioxarray as rio
 import pandas as pd
@@ -17,6 +15,7 @@ from rasterio.enums import Resampling
 from scipy.ndimage import distance_transform_edt
 from tools.FullCAM2020_to_NetCDF import export_to_geotiff_with_band_names
 from tools.XML2Data import get_species_data, parse_species_data
+from tools.parameter import CARBON_CSV_COORDS
 
 from tools.helpers.cache_manager import get_existing_downloads
 from tools import get_downloading_coords, get_plot_simulation, get_species
@@ -186,21 +185,29 @@ TYF_specID_8 = xr.open_dataset(f'data/Species_TYF_R/specId_8_match_LUTO.nc').com
 
 # Get downloaded carbon data CSV files; does not matter which species because SiteInfo is the same for all species
 FullCAM_retrive_dir ='data/processed/Compare_API_and_Assemble_Data_Simulations/download_csv'
-csv_files = [i for i in glob(f'{FullCAM_retrive_dir}/*.csv') if f'specId_8_specCat_Block' in i]
+csv_files = glob(f'{FullCAM_retrive_dir}/df_*_specId_8_specCat_Block_*.csv')
 
-data_compare = pd.DataFrame()
-for f in tqdm(csv_files):
+csv_coords = [CARBON_CSV_COORDS.search(f).groups() for f in csv_files]
+
+# Get TYF data from reprojected dataset at all lon/lat in one vectorised selection
+TYF_specID_8_pts = TYF_specID_8.sel(
+    x=xr.DataArray([float(lon) for lon, _ in csv_coords], dims='points'),
+    y=xr.DataArray([float(lat) for _, lat in csv_coords], dims='points'),
+    method='nearest'
+)
+
+data_compare_parts = []
+for i, (lon, lat) in enumerate(tqdm(csv_coords)):
     # Get Cache data
     #   The SiteInfo data for the FullCAM carbon df at lon/lat already downloaded
-    lon, lat  = re.findall(r'df_(-?\d+\.\d+)_(-?\d+\.\d+)_specId_', os.path.basename(f))[0]
     with open(f'downloaded/species_{lon}_{lat}_specId_8.xml', 'r') as file:
         FullCAM_soil = parse_species_data(file.read())
         FullCAM_soil = FullCAM_soil.to_dataframe().reset_index()
         FullCAM_soil = FullCAM_soil.melt(id_vars=['TYF_Type'], value_vars=['Block', 'Belt'], var_name='Geometry', value_name='Value')
     # Get TYF data from reprojected dataset at the lon/lat
     TYF_specID_8_pt = (
-        TYF_specID_8
-        .sel(x=float(lon), y=float(lat), method='nearest')
+        TYF_specID_8_pts
+        .isel(points=i)
         .to_dataframe()
         .reset_index()
         .melt(id_vars=['TYF_Type'], value_vars=['Block', 'Belt'], var_name='Geometry', value_name='Value')
@@ -210,10 +217,14 @@ for f in tqdm(csv_files):
         FullCAM_soil,
         TYF_specID_8_pt,
         on=['TYF_Type', 'Geometry'],
+        how='inner',
+        validate='one_to_one',
         suffixes=('_FullCAM', '_v2020')
     )
     TYF_merged[['x', 'y']] = float(lon), float(lat)
-    data_compare = pd.concat([data_compare, TYF_merged], ignore_index=True)
+    data_compare_parts.append(TYF_merged)
+
+data_compare = pd.concat(data_compare_parts, ignore_index=True)
     
 # Plot comparison
 p9.options.figure_size = (6, 6)
@@ -233,7 +244,7 @@ fig = (
     )
 )
 
-fig.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_Species_TYF_R_specId_8.svg', dpi=150)
+fig.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_Species_TYF_R_specId_8.png', dpi=200)
     
 
 
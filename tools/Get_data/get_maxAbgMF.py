@@ -1,7 +1,5 @@
 
 import io
-import os
-import re
 import zipfile
 import pandas as pd
 import rioxarray as rio
@@ -11,23 +9,17 @@ import plotnine as p9
 
 from glob import glob
 from tqdm.auto import tqdm
+from joblib import Parallel, delayed
 
-from tools import get_downloading_coords
 from tools.XML2Data import parse_site_data
-from tools.helpers.cache_manager import get_existing_downloads
+from tools.parameter import CARBON_CSV_COORDS
+from tools.helpers.res_coords import get_res_coords
 
 
 
 
-# Get resfactored coords for downloading
-SPECIES_ID = 8          # Eucalyptus globulus
-SPECIES_CAT = 'Block'   # Block or Belt; need to confirm with individual species
-scrap_coords = get_downloading_coords(resfactor=10).set_index(['x', 'y']).index.tolist()
-existing_siteinfo, existing_species, existing_dfs = get_existing_downloads(SPECIES_ID, SPECIES_CAT)
-
-res_coords = set(existing_siteinfo).intersection(set(scrap_coords))
-res_coords_x = xr.DataArray([coord[0] for coord in res_coords], dims=['cell'])
-res_coords_y = xr.DataArray([coord[1] for coord in res_coords], dims=['cell'])
+# Get resfactored coords that have a downloaded siteInfo file
+res_coords_x, res_coords_y = get_res_coords(resfactor=10)
 
 
 
@@ -52,26 +44,34 @@ maxAbgMF_DCCEEW = xr.load_dataset('data/maxAbgMF/maxAbgMF.nc')['data']
 
 # Get downloaded carbon data CSV files; does not matter which species because SiteInfo is the same for all species
 FullCAM_retrive_dir ='data/processed/Compare_API_and_Assemble_Data_Simulations/download_csv'
-csv_files = [i for i in glob(f'{FullCAM_retrive_dir}/*.csv') if f'specId_8_specCat_Block' in i]
+csv_files = glob(f'{FullCAM_retrive_dir}/df_*_specId_8_specCat_Block_*.csv')
+
+csv_coords = [CARBON_CSV_COORDS.search(f).groups() for f in csv_files]
+
+# Get maxAbgMF from DCCEEW at all lon/lat in one vectorised selection
+maxAbgMF_pts = maxAbgMF_DCCEEW.sel(
+    x=xr.DataArray([float(lon) for lon, _ in csv_coords], dims='points'),
+    y=xr.DataArray([float(lat) for _, lat in csv_coords], dims='points'),
+    method='nearest'
+).values
 
-data_compare = pd.DataFrame()
-for f in tqdm(csv_files):
-    # Get Cache data
-    #   The SiteInfo data for the FullCAM carbon df at lon/lat already downloaded
-    lon, lat  = re.findall(r'df_(-?\d+\.\d+)_(-?\d+\.\d+)_specId_', os.path.basename(f))[0]
+def get_FullCAM_maxAbgMF(lon, lat):
+    """maxAbgMF from the SiteInfo data already downloaded for the FullCAM carbon df at lon/lat."""
     with open(f'downloaded/siteInfo_{lon}_{lat}.xml', 'r') as file:
-        FullCAM_siteinfo = parse_site_data(file.read())['maxAbgMF']
-        FullCAM_siteinfo = FullCAM_siteinfo.data.item()
-    # Get maxAbgMF from DCCEEW at the lon/lat
-    maxAbgMF_pt = maxAbgMF_DCCEEW.sel(x=float(lon), y=float(lat), method='nearest').data.item()
-    # Merge FullCAM and DCCEEW maxAbgMF data, then append to main dataframe
-    maxAbgMF_merged = pd.DataFrame({
-        'maxAbgMF_FullCAM': [FullCAM_siteinfo],
-        'maxAbgMF_DCCEEW': [maxAbgMF_pt],
-        'x': [float(lon)],
-        'y': [float(lat)],
-    })
-    data_compare = pd.concat([data_compare, maxAbgMF_merged], ignore_index=True)
+        return parse_site_data(file.read())['maxAbgMF'].data.item()
+
+# The SiteInfo files are read and parsed independently, so run them in parallel. Parsing the
+#   XML is CPU work that holds the GIL, so the points are spread over processes (loky)
+#   rather than threads; joblib batches the small tasks to keep the dispatch cheap
+tasks = [delayed(get_FullCAM_maxAbgMF)(lon, lat) for lon, lat in csv_coords]
+maxAbgMF_FullCAM = list(tqdm(Parallel(n_jobs=-1, backend='loky', return_as='generator')(tasks), total=len(tasks)))
+
+data_compare = pd.DataFrame({
+    'maxAbgMF_FullCAM': maxAbgMF_FullCAM,
+    'maxAbgMF_DCCEEW': maxAbgMF_pts,
+    'x': [float(lon) for lon, _ in csv_coords],
+    'y': [float(lat) for _, lat in csv_coords],
+})
     
 
 # Plot comparison
@@ -91,4 +91,4 @@ fig = (
     )
 )
 
-fig.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_SiteInfo_maxAbgMF.svg', dpi=150)
+fig.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_SiteInfo_maxAbgMF.png', dpi=200)
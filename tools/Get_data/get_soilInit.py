@@ -1,6 +1,4 @@
 
-import os
-import re
 import pandas as pd
 import xarray as xr
 import plotnine as p9
@@ -9,6 +7,7 @@ from glob import glob
 from tqdm.auto import tqdm
 
 from tools.XML2Data import parse_init_data
+from tools.parameter import CARBON_CSV_COORDS
 
 
 
@@ -32,13 +31,21 @@ soil_init = (
 
 # Get downloaded carbon data CSV files; does not matter which species because SiteInfo is the same for all species
 FullCAM_retrive_dir ='data/processed/Compare_API_and_Assemble_Data_Simulations/download_csv'
-csv_files = [i for i in glob(f'{FullCAM_retrive_dir}/*.csv') if f'specId_8_specCat_Block' in i]
+csv_files = glob(f'{FullCAM_retrive_dir}/df_*_specId_8_specCat_Block_*.csv')
 
-data_compare = pd.DataFrame()
-for f in tqdm(csv_files):
+csv_coords = [CARBON_CSV_COORDS.search(f).groups() for f in csv_files]
+
+# Get SoilInit from Brett's assembled PLO data at all lon/lat in one vectorised selection
+soil_init_pts = soil_init.sel(
+    x=xr.DataArray([float(lon) for lon, _ in csv_coords], dims='points'),
+    y=xr.DataArray([float(lat) for _, lat in csv_coords], dims='points'),
+    method='nearest'
+)
+
+data_compare_parts = []
+for i, (lon, lat) in enumerate(tqdm(csv_coords)):
     # Get Cache data
     #   The SiteInfo data for the FullCAM carbon df at lon/lat already downloaded
-    lon, lat  = re.findall(r'df_(-?\d+\.\d+)_(-?\d+\.\d+)_specId_', os.path.basename(f))[0]
     with open(f'downloaded/siteInfo_{lon}_{lat}.xml', 'r') as file:
         FullCAM_soil = parse_init_data(file.read(), tsmd_year=2010)
         FullCAM_soil = pd.DataFrame({
@@ -47,8 +54,8 @@ for f in tqdm(csv_files):
         })
     # Get SoilInit from Brett's assembled PLO data at the lon/lat
     soil_init_pt = (
-        soil_init
-        .sel(x=float(lon), y=float(lat), method='nearest')
+        soil_init_pts
+        .isel(points=i)
         .to_dataframe()
         .reset_index()
         .rename(columns={'band':'Variable', 'data':'SoilInit'})
@@ -58,10 +65,14 @@ for f in tqdm(csv_files):
         FullCAM_soil,
         soil_init_pt,
         on='Variable',
+        how='inner',
+        validate='one_to_one',
         suffixes=('_FullCAM', '_AssembledPLO')
     )
     soil_init_merged[['x', 'y']] = float(lon), float(lat)
-    data_compare = pd.concat([data_compare, soil_init_merged], ignore_index=True)
+    data_compare_parts.append(soil_init_merged)
+
+data_compare = pd.concat(data_compare_parts, ignore_index=True)
     
     
 # Plot comparison
@@ -82,5 +93,5 @@ fig = (
     )
 )
 
-fig.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_SiteInfo_soilInit.svg', dpi=150)
+fig.save('data/processed/Compare_API_and_Assemble_Data_Simulations/Data_compare_SiteInfo_soilInit.png', dpi=200)
 
@@ -305,9 +305,12 @@ def get_carbon_data(
     variables = ['DEBRIS_C_HA', 'SOIL_C_HA', 'TREE_C_HA']
     years = np.arange(sim_year_start, sim_year_end + 1)
 
+    carbon_cols = ['C mass of plants  (tC/ha)', 'C mass of debris  (tC/ha)', 'C mass of soil  (tC/ha)']
     df = pd.read_csv(
         filepath,
-        usecols=['Year', 'C mass of plants  (tC/ha)', 'C mass of debris  (tC/ha)', 'C mass of soil  (tC/ha)']
+        usecols=['Year', *carbon_cols],
+        dtype=dict.fromkeys(carbon_cols, np.float32),   # parsed straight to the output dtype
+        engine='c',
     )
     df = df[df['Year'] >= sim_year_start].rename(columns={
         'Year': 'YEAR',
@@ -317,10 +320,10 @@ def get_carbon_data(
     }).set_index('YEAR').reindex(years)[variables]
 
     df_xr = xr.DataArray(
-        df.values.astype(np.float32)[np.newaxis, np.newaxis, :, :],
+        df.to_numpy(dtype=np.float32)[np.newaxis, np.newaxis, :, :],
         coords={'y': [lat], 'x': [lon], 'YEAR': years, 'VARIABLE': variables},
         dims=['y', 'x', 'YEAR', 'VARIABLE']
-    ).astype(np.float32)
+    )
 
     return df_xr
 
@@ -329,7 +332,8 @@ def export_to_geotiff_with_band_names(
     xarry:xr.DataArray, 
     output_path:str, 
     band_dim:str='band', 
-    compress:str='lzw'
+    compress:str='lzw',
+    predictor:int=1
 )->None:
     """
     Export xarray DataArray to GeoTIFF with proper band names/descriptions.
@@ -350,6 +354,9 @@ def export_to_geotiff_with_band_names(
         its coordinate values will be used as band descriptions.
     compress : str, optional
         Compression method for GeoTIFF (default: 'lzw'). Common options: 'lzw', 'deflate', 'packbits'
+    predictor : int, optional
+        GDAL compression predictor (default: 1, none). 2 (horizontal differencing) suits
+        integer data and 3 (floating point) suits float data; both usually shrink LZW output.
 
     Returns
     -------
@@ -380,6 +387,7 @@ def export_to_geotiff_with_band_names(
         'crs': xarry.rio.crs,
         'transform': xarry.rio.transform(),
         'compress': compress,
+        'predictor': predictor,
         'tiled': True,
         'blockxsize': 256,
         'blockysize': 256,
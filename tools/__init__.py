@@ -96,9 +96,48 @@ def get_downloading_coords(resfactor:int=10, include_region:str='ALL') -> pd.Dat
     return scrap_coords
 
 
+def _pack_coords(coords) -> np.ndarray:
+    '''
+    Pack (lon, lat) pairs into one uint64 key per pair; lon in the high 32 bits, lat in the low.
+
+    The coords are the 4-dp values from `get_downloading_coords` (also what ends up in the
+    download filenames), so quantising by 1e4 is lossless. Each half holds the int32 bit
+    pattern, so negative latitudes survive the round trip.
+    '''
+    coords = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    quantised = np.rint(coords * 1e4).astype(np.int32).view(np.uint32).astype(np.uint64)
+    return (quantised[:, 0] << np.uint64(32)) | quantised[:, 1]
+
+
+def intersect_coords(coords_a, coords_b) -> np.ndarray:
+    '''
+    Coords present in both inputs, e.g. the downloaded files and the resfactored grid.
+
+    Intersecting Python sets of (float, float) tuples hashes every tuple, which gets slow
+    (and GC heavy) for millions of coords. Here each pair is packed into a uint64 and the
+    intersection is done by `np.intersect1d` on the packed keys.
+
+    Parameters
+    ----------
+    coords_a, coords_b : array-like
+        (lon, lat) pairs; a list of tuples or an (n, 2) array.
+
+    Returns
+    -------
+        np.ndarray of shape (n, 2) with the unique (lon, lat) pairs found in both inputs.
+    '''
+    common = np.intersect1d(_pack_coords(coords_a), _pack_coords(coords_b))
+    lon = (common >> np.uint64(32)).astype(np.uint32).view(np.int32) / 1e4
+    lat = (common & np.uint64(0xFFFFFFFF)).astype(np.uint32).view(np.int32) / 1e4
+    return np.column_stack([lon, lat])
+
+
+_BOOL_XML = ("false", "true")
+
+
 def _bool_to_xml(value: bool) -> str:
     """Convert Python bool to XML string format ('true'/'false')."""
-    return "true" if value else "false"
+    return _BOOL_XML[bool(value)]
 
 
 def get_siteinfo(
@@ -2,18 +2,29 @@
 Download cache management for FullCAM API data.
 
 Provides functions to:
-- Load existing downloads from cache file (fast)
+- Load existing downloads from cache file (fast), via a shard index kept beside its directory
 - Rebuild cache from directory scan (slow, one-time)
 - Automatically use cache or rebuild if missing
 """
 
 import os
 import re
-from typing import Tuple, List
+import shutil
+import fnmatch
+import hashlib
+import numpy as np
+from typing import Tuple, List, Union
+from itertools import islice
+from collections import defaultdict
+from contextlib import contextmanager
 from scandir_rs import Scandir
 from tqdm.auto import tqdm
 from joblib import Parallel, delayed
 
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
 
 
 # df_{lon}_{lat}_specId_{id}_specCat_{cat}_ssp_{ssp}_InData_{yyyy_yyyy}_SIM_YR_{yyyy}_{yyyy}.csv
@@ -24,6 +35,46 @@ DF_PATTERN = (
     r'_ssp_([A-Za-z0-9]+)_InData_(\d{4}_\d{4})_SIM_YR_(\d{4})_(\d{4})\.csv'
 )
 
+# Filenames of all record types in one pattern, used by `rebuild_cache` on the scanned paths.
+#   It matches after the last path separator, so no basename is taken, and the named group that
+#   matched (`m.lastgroup`) gives the record type. Compiled at module level so the worker
+#   processes get it from the module import instead of recompiling per chunk.
+RECORD_FILE_REG = re.compile(
+    r'(?:^|[/\\])(?:'
+    r'(?P<siteinfo>siteInfo_-?\d+\.\d+_-?\d+\.\d+\.xml)'
+    r'|(?P<species>species_-?\d+\.\d+_-?\d+\.\d+_specId_\d+\.xml)'
+    rf'|(?P<df>{DF_PATTERN})'
+    r')$'
+)
+
+# The index is a set of shard files derived from the cache file, one per record type and, for
+#   species/df records, per filter combination, so `load_cache` only reads the records it asked
+#   for. Each shard is a raw float64 (lon, lat) array, so reading it needs no text parsing;
+#   float64 (not float32) keeps the coords equal to the rounded values they are matched against.
+#   Bump INDEX_VERSION whenever the shard layout changes; a stale index is rebuilt.
+INDEX_VERSION = 4
+
+# Bytes of the cache file, ending where the index stopped, hashed into VERSION. The next
+#   update recomputes the hash and re-indexes from scratch if it differs, i.e. the file was
+#   replaced, even by a larger one, rather than only appended to.
+FINGERPRINT_SIZE = 64 * 1024
+
+# Splits a cache record into its type, lon, lat and the filter tag that follows them, e.g.
+#   df_{lon}_{lat}_specId_8_specCat_Block_ssp_..._SIM_YR_2010_2100.csv -> ('df', lon, lat,
+#   '_specId_8_specCat_Block_ssp_..._SIM_YR_2010_2100'). The tag never contains a '.', so it is
+#   matched as `[^.\r\n]*` in one run up to the extension instead of a lazy `.*?` that retries
+#   the extension at every byte. `\r?` allows for files written on Windows.
+RECORD_PATTERN = re.compile(
+    rb'^(siteInfo|species|df)_(-?\d+\.\d+)_(-?\d+\.\d+)([^.\r\n]*)\.(?:xml|csv)\r?$',
+    re.MULTILINE
+)
+
+# Number of paths classified per `rebuild_cache` task
+SCAN_CHUNK_SIZE = 250_000
+
+# Number of filenames joined into one write when `rebuild_cache` writes the cache file
+WRITE_CHUNK_SIZE = 100_000
+
 
 def get_existing_downloads(
     specId: int,
@@ -84,6 +135,169 @@ def get_existing_downloads(
 
 
 
+def _get_index_dir(cache_file: str) -> str:
+    """
+    Directory holding the shard index of `cache_file`.
+
+    It sits beside the directory of the cache file rather than inside it, e.g.
+    'downloaded/successful_downloads.txt' -> 'downloaded_index/successful_downloads', so the
+    scans of `rebuild_cache` and `batch_remove_files` over 'downloaded/' never reach it.
+    """
+    cache_dir, cache_name = os.path.split(os.path.abspath(cache_file))
+    return f'{cache_dir}_index/{os.path.splitext(cache_name)[0]}'
+
+
+@contextmanager
+def _index_lock(index_dir: str):
+    """
+    Hold an exclusive lock on the shard index of one cache file, across threads and processes.
+
+    The lock is a file beside the index directory, so the index itself can be removed and
+    rebuilt while it is held.
+    """
+    os.makedirs(os.path.dirname(index_dir), exist_ok=True)
+    with open(f'{index_dir}.lock', 'a+b') as f:
+        if os.name == 'nt':
+            # LK_LOCK gives up after ~10 s of retries; keep waiting like flock does
+            while True:
+                try:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    pass
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            # flock is released when the file is closed; msvcrt needs an explicit unlock
+            if os.name == 'nt':
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def _read_index_version(version_file: str) -> Tuple[int, int, str, dict]:
+    """
+    Read the VERSION file of a shard index.
+
+    Returns
+    -------
+    Tuple[int, int, str, dict]
+        (index_version, indexed_size, fingerprint, {shard: size in bytes});
+        (-1, 0, '', {}) if it is missing
+    """
+    if not os.path.exists(version_file):
+        return -1, 0, '', {}
+    with open(version_file, 'r', encoding='utf-8') as f:
+        header, *shard_lines = f.read().splitlines()
+    index_version, indexed_size, *fingerprint = header.split()
+    shard_sizes = {shard: int(size) for shard, size in map(str.split, shard_lines)}
+    return int(index_version), int(indexed_size), ''.join(fingerprint), shard_sizes
+
+
+def _prefix_fingerprint(f, size: int) -> str:
+    """Hash of the FINGERPRINT_SIZE bytes of the open file `f` that end at offset `size`."""
+    f.seek(max(size - FINGERPRINT_SIZE, 0))
+    return hashlib.blake2b(f.read(min(size, FINGERPRINT_SIZE)), digest_size=16).hexdigest()
+
+
+def update_cache_index(
+    cache_file: str = 'downloaded/successful_downloads.txt'
+) -> None:
+    """
+    Bring the shard index of the cache file up to date.
+
+    The cache file is append-only (the download functions add one line per success), so
+    only the bytes added since the last update are parsed and appended to their shards. The
+    index is rebuilt from scratch when it is missing, from an older INDEX_VERSION, when a
+    shard it lists is missing or short, or when the cache file shrank or its indexed part
+    no longer matches the fingerprint in VERSION (i.e. it was rebuilt or replaced).
+
+    Parameters
+    ----------
+    cache_file : str, optional
+        Path to cache file (default: 'downloaded/successful_downloads.txt')
+    """
+    index_dir = _get_index_dir(cache_file)
+    with _index_lock(index_dir):
+        _update_cache_index(cache_file, index_dir)
+
+
+def _update_cache_index(cache_file: str, index_dir: str) -> None:
+    """Body of `update_cache_index`; the caller holds the index lock."""
+    version_file = f'{index_dir}/VERSION'
+    cache_size = os.path.getsize(cache_file)
+
+    # VERSION holds '{INDEX_VERSION} {bytes of cache_file already indexed} {fingerprint}'
+    #   followed by one '{shard} {bytes}' line per shard, so a shard lost since the last
+    #   update is noticed rather than read back as an empty result
+    index_version, indexed_size, fingerprint, shard_sizes = _read_index_version(version_file)
+    shards_intact = all(
+        os.path.exists(f'{index_dir}/{shard}.bin') and os.path.getsize(f'{index_dir}/{shard}.bin') >= size
+        for shard, size in shard_sizes.items()
+    )
+
+    with open(cache_file, 'rb') as f:
+        prefix_unchanged = indexed_size <= cache_size and _prefix_fingerprint(f, indexed_size) == fingerprint
+
+    if index_version != INDEX_VERSION or not prefix_unchanged or not shards_intact:
+        shutil.rmtree(index_dir, ignore_errors=True)
+        indexed_size, shard_sizes = 0, {}
+
+    # Shards are appended before VERSION is written, so an update that died in between
+    #   leaves records past the sizes VERSION recorded. Cut them off (or drop shards VERSION
+    #   does not know) so those records are not indexed twice.
+    if os.path.isdir(index_dir):
+        for entry in os.scandir(index_dir):
+            shard, ext = os.path.splitext(entry.name)
+            if ext == '.bin' and entry.stat().st_size != shard_sizes.get(shard, 0):
+                os.truncate(entry.path, shard_sizes.get(shard, 0))
+
+    if indexed_size == cache_size:
+        return
+
+    # Only index complete lines; a record still being appended is picked up next time
+    with open(cache_file, 'rb') as f:
+        f.seek(indexed_size)
+        new_records = f.read(cache_size - indexed_size)
+        new_records = new_records[:new_records.rfind(b'\n') + 1]
+        new_indexed_size = indexed_size + len(new_records)
+        new_fingerprint = _prefix_fingerprint(f, new_indexed_size)
+
+    shards = defaultdict(list)
+    for record_type, lon, lat, tag in RECORD_PATTERN.findall(new_records):
+        shards[record_type + tag].extend((lon, lat))
+
+    os.makedirs(index_dir, exist_ok=True)
+    for shard, lon_lat in shards.items():
+        shard = shard.decode()
+        lon_lat = np.array(lon_lat, dtype=bytes).astype(np.float64)
+        with open(f'{index_dir}/{shard}.bin', 'ab') as f:
+            lon_lat.tofile(f)
+        shard_sizes[shard] = shard_sizes.get(shard, 0) + lon_lat.nbytes
+
+    # VERSION is written last and swapped in whole, so it only ever describes shards that
+    #   are fully on disk
+    with open(f'{version_file}.tmp', 'w', encoding='utf-8') as f:
+        f.write(f'{INDEX_VERSION} {new_indexed_size} {new_fingerprint}\n')
+        f.writelines(f'{shard} {size}\n' for shard, size in shard_sizes.items())
+    os.replace(f'{version_file}.tmp', version_file)
+
+
+def _read_shard(index_dir: str, shard: str) -> List[Tuple[float, float]]:
+    """
+    Read the (lon, lat) pairs of one index shard as float tuples.
+
+    The shard is raw float64, so this is a single read with no parsing.
+    """
+    shard_file = f'{index_dir}/{shard}.bin'
+    if not os.path.exists(shard_file):
+        return []
+    lon_lat = np.fromfile(shard_file, dtype=np.float64).reshape(-1, 2)
+    return list(zip(lon_lat[:, 0].tolist(), lon_lat[:, 1].tolist()))
+
+
 def load_cache(
     specId: int,
     specCat: str,
@@ -121,10 +335,6 @@ def load_cache(
         List of (lon, lat) tuples for existing simulation dataframe files
         (filtered by specId, specCat, scenario and simulation period)
     """
-    lon_lat_reg_xml = re.compile(r'siteInfo_(-?\d+\.\d+)_(-?\d+\.\d+)\.xml')
-    lon_lat_reg_species = re.compile(r'species_(-?\d+\.\d+)_(-?\d+\.\d+)_specId_(\d+)\.xml')
-    lon_lat_reg_csv = re.compile(DF_PATTERN)
-
     existing_siteinfo = []
     existing_species = []
     existing_dfs = []
@@ -137,42 +347,56 @@ def load_cache(
     print(f"Filtering for specId={specId}, specCat={specCat}, ssp={ssp}, "
           f"data_year_range={data_year_range}, sim years={sim_year_start}-{sim_year_end}")
 
-    with open(cache_file, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-
-            if line.startswith('siteInfo_'):
-                match = lon_lat_reg_xml.match(line)
-                if match:
-                    lon, lat = match.groups()
-                    existing_siteinfo.append((float(lon), float(lat)))
-            elif line.startswith('species_'):
-                match = lon_lat_reg_species.match(line)
-                if match:
-                    lon, lat, file_specId = match.groups()
-                    if int(file_specId) == specId:
-                        existing_species.append((float(lon), float(lat)))
-            elif line.startswith('df_'):
-                match = lon_lat_reg_csv.match(line)
-                if match:
-                    (lon, lat, file_specId, file_specCat, file_ssp,
-                     file_data_year_range, file_sim_year_start, file_sim_year_end) = match.groups()
-                    if (int(file_specId) == specId
-                            and file_specCat == specCat
-                            and file_ssp == ssp
-                            and file_data_year_range == data_year_range
-                            and int(file_sim_year_start) == sim_year_start
-                            and int(file_sim_year_end) == sim_year_end):
-                        existing_dfs.append((float(lon), float(lat)))
+    # Only the shards of the requested records are read, so the load scales with the number
+    #   of matching records rather than with the whole cache. The lock is held over the reads
+    #   too, so another process cannot append to or drop a shard while it is read.
+    index_dir = _get_index_dir(cache_file)
+    with _index_lock(index_dir):
+        _update_cache_index(cache_file, index_dir)
+        existing_siteinfo = _read_shard(index_dir, 'siteInfo')
+        existing_species = _read_shard(index_dir, f'species_specId_{specId}')
+        existing_dfs = _read_shard(
+            index_dir,
+            f'df_specId_{specId}_specCat_{specCat}_ssp_{ssp}'
+            f'_InData_{data_year_range}_SIM_YR_{sim_year_start}_{sim_year_end}'
+        )
 
     print(f"Loaded {len(existing_siteinfo):,} siteInfo, {len(existing_species):,} species, and {len(existing_dfs):,} df entries from cache")
 
     return existing_siteinfo, existing_species, existing_dfs
 
 
+def _classify_files(filepaths: List[str]) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Sort a chunk of scanned paths into siteInfo, species and df filenames.
+
+    Parameters
+    ----------
+    filepaths : List[str]
+        Paths returned by the directory scan
+
+    Returns
+    -------
+    Tuple[List[str], List[str], List[str]]
+        (siteinfo_files, species_files, df_files) - matching filenames of each file type
+    """
+    files = {'siteinfo': [], 'species': [], 'df': []}
+
+    # Bind the per-entry method to a local; saves an attribute lookup per call across ~40M entries
+    record_search = RECORD_FILE_REG.search
+
+    for filepath in filepaths:
+        m = record_search(filepath)
+        if m:
+            files[m.lastgroup].append(m.group(m.lastgroup))
+
+    return files['siteinfo'], files['species'], files['df']
+
+
 def rebuild_cache(
     downloaded_dir: str = 'downloaded',
-    cache_file: str = 'downloaded/successful_downloads.txt'
+    cache_file: str = 'downloaded/successful_downloads.txt',
+    n_jobs: int = -1
 ) -> Tuple[int, int, int]:
     """
     Rebuild cache by scanning downloaded/ directory for ALL records.
@@ -191,6 +415,8 @@ def rebuild_cache(
         Directory containing downloaded XML files (default: 'downloaded')
     cache_file : str, optional
         Path to cache file to create (default: 'downloaded/successful_downloads.txt')
+    n_jobs : int, optional
+        Number of processes classifying the scanned files (default: -1, all cores)
 
     Returns
     -------
@@ -206,36 +432,47 @@ def rebuild_cache(
     print("This is a one-time slow operation for large directories.")
     print("Scanning ALL siteInfo, species, and df files...")
 
-    files = [entry.path for entry in Scandir(downloaded_dir)]
-
-    # Regex patterns to match all file types (no filtering by specId/specCat)
-    lon_lat_reg_siteinfo = re.compile(r'siteInfo_(-?\d+\.\d+)_(-?\d+\.\d+)\.xml')
-    lon_lat_reg_species = re.compile(r'species_(-?\d+\.\d+)_(-?\d+\.\d+)_specId_\d+\.xml')
-    lon_lat_reg_df = re.compile(DF_PATTERN)
+    # Classify all filenames (no filtering by specId/specCat). The scan is consumed lazily, one
+    #   chunk of paths at a time, so the full ~40M path list is never held in memory. The regex
+    #   matching is CPU-bound, so chunks are spread over processes (loky) rather than threads.
+    #   Downloads are written flat into `downloaded_dir`, so only its top level is scanned.
+    paths = (entry.path for entry in Scandir(downloaded_dir, max_depth=1))
+    chunks = iter(lambda: list(islice(paths, SCAN_CHUNK_SIZE)), [])
+    tasks = (delayed(_classify_files)(chunk) for chunk in chunks)
 
     siteinfo_files = []
     species_files = []
     df_files = []
-
-    # Collect all filenames
-    for filepath in tqdm(files, desc="Scanning files"):
-        filename = os.path.basename(filepath)
-
-        if filename.startswith('siteInfo_'):
-            if lon_lat_reg_siteinfo.match(filename):
-                siteinfo_files.append(filename)
-        elif filename.startswith('species_'):
-            if lon_lat_reg_species.match(filename):
-                species_files.append(filename)
-        elif filename.startswith('df_'):
-            if lon_lat_reg_df.match(filename):
-                df_files.append(filename)
-
-    with open(cache_file, 'w', encoding='utf-8') as f:
-        all_files = sorted(siteinfo_files + species_files + df_files)
-        iterator = tqdm(all_files, desc="Writing cache")
-        for filename in iterator:
-            f.write(f'{filename}\n')
+    for siteinfo_chunk, species_chunk, df_chunk in tqdm(
+        Parallel(n_jobs=n_jobs, backend='loky', return_as='generator')(tasks),
+        desc="Scanning files",
+        unit="chunk"
+    ):
+        siteinfo_files.extend(siteinfo_chunk)
+        species_files.extend(species_chunk)
+        df_files.extend(df_chunk)
+
+    # Sort each file type on its own rather than the concatenation of all three. Their prefixes
+    #   sort as 'df_' < 'siteInfo_' < 'species_', so writing the sorted lists one after another
+    #   gives the same order as sorting everything, with no merge and no combined list.
+    df_files.sort()
+    siteinfo_files.sort()
+    species_files.sort()
+
+    # One write per WRITE_CHUNK_SIZE filenames instead of one per filename
+    with open(cache_file, 'wb', buffering=8 * 1024 * 1024) as f:
+        total = len(df_files) + len(siteinfo_files) + len(species_files)
+        with tqdm(total=total, desc="Writing cache") as pbar:
+            for type_files in (df_files, siteinfo_files, species_files):
+                for i in range(0, len(type_files), WRITE_CHUNK_SIZE):
+                    chunk = type_files[i:i + WRITE_CHUNK_SIZE]
+                    f.write(('\n'.join(chunk) + '\n').encode('utf-8'))
+                    pbar.update(len(chunk))
+
+    # The shard index describes the old cache file; drop it so the next load re-indexes
+    index_dir = _get_index_dir(cache_file)
+    with _index_lock(index_dir):
+        shutil.rmtree(index_dir, ignore_errors=True)
 
     # Final report
     print(f"\nCache rebuilt successfully!")
@@ -247,42 +484,54 @@ def rebuild_cache(
     return len(siteinfo_files), len(species_files), len(df_files)
 
 
-def _remove_single_file(filepath: str) -> Tuple[str, bool, str]:
+# Number of files removed per `batch_remove_files` task
+RM_BATCH_SIZE = 1024
+
+
+def _remove_files_batch(filepaths: List[str], dir_fd: int = None) -> Tuple[int, List[Tuple[str, str]]]:
     """
-    Remove a single file.
+    Remove a batch of files in one task.
 
     Parameters
     ----------
-    filepath : str
-        Full path to the file to remove
+    filepaths : List[str]
+        Full paths of the files to remove, or paths relative to `dir_fd` if given
+    dir_fd : int, optional
+        Descriptor of the directory `filepaths` are relative to (default: None)
 
     Returns
     -------
-    Tuple[str, bool, str]
-        (filepath, success, error_message)
+    Tuple[int, List[Tuple[str, str]]]
+        (attempted_count, list of (filepath, error) for failures)
     """
-    try:
-        os.remove(filepath)
-        return (filepath, True, "")
-    except Exception as e:
-        return (filepath, False, str(e))
+    failures = []
+    for filepath in filepaths:
+        try:
+            os.remove(filepath, dir_fd=dir_fd)
+        except OSError as e:
+            failures.append((filepath, str(e)))
+    return len(filepaths), failures
 
 
 def batch_remove_files(
-    pattern: str,
+    pattern: Union[str, List[str]],
     directory: str = 'downloaded',
     n_jobs: int = 100,
 ) -> Tuple[int, int, List[Tuple[str, str]]]:
     """
-    Batch remove files containing a pattern string in their filename.
+    Batch remove download files containing a pattern string in their filename.
 
-    Uses joblib with threading backend for fast parallel deletion.
+    Only the siteInfo/species XML and df CSV files at the top level of `directory` (the
+    names matched by RECORD_FILE_REG) are candidates, so the cache file and anything else
+    kept there, e.g. an index, are never removed. Uses joblib with threading backend for
+    fast parallel deletion.
 
     Parameters
     ----------
-    pattern : str
-        String pattern to match in filenames. Any file whose name contains
-        this string will be removed.
+    pattern : str or List[str]
+        String pattern(s) to match in filenames. Any file whose name contains
+        one of them will be removed. Shell wildcards (`*`, `?`, `[...]`) are
+        allowed, e.g. 'specId_8_*_ssp_SSP245'.
     directory : str, optional
         Directory to search for files (default: 'downloaded')
     n_jobs : int, optional
@@ -292,36 +541,73 @@ def batch_remove_files(
     -------
     Tuple[int, int, List[Tuple[str, str]]]
         (success_count, failure_count, list of (filepath, error) for failures)
+
+    Raises
+    ------
+    ValueError
+        If no pattern is given or one of them is empty; either would match every file.
     """
+    patterns = [pattern] if isinstance(pattern, str) else list(pattern)
+    if not patterns or not all(patterns):
+        raise ValueError(f"`pattern` must be one or more non-empty strings, got {pattern!r}.")
+
     if not os.path.exists(directory):
         print(f"Error: Directory {directory} not found!")
         return 0, 0, []
 
-    print(f"Scanning {directory} for files containing '{pattern}'...")
-
-    # Scan directory for matching files
-    matching_files = []
-    files = [entry.path for entry in Scandir(directory)]
-    for entry in files:
-        filename = os.path.basename(entry)
-        if pattern in filename:
-            matching_files.append(entry)
+    print(f"Scanning {directory} for files containing {patterns} and removing them using {n_jobs} threads...")
+
+    # All patterns compiled into one regex, so each filename is matched once whatever the
+    #   number of patterns; '*...*' keeps the 'contains' meaning of a plain string.
+    pattern_match = re.compile(
+        '|'.join(f'(?:{fnmatch.translate(f"*{p}*")})' for p in patterns)
+    ).match
+
+    # Filter during the scan and feed matches straight to the deletion threads, so the
+    #   ~40M scanned paths are never collected into a list. The scan stops at the top level,
+    #   so each path is a bare filename.
+    record_match = RECORD_FILE_REG.match
+    matching_files = (
+        entry.path for entry in Scandir(directory, max_depth=1)
+        if record_match(entry.path) and pattern_match(entry.path)
+    )
 
-    if not matching_files:
-        print(f"No files found containing '{pattern}'")
+    # Remove relative to a descriptor of the directory where supported (POSIX), so the kernel
+    #   does not resolve the directory part of the path again for every file
+    if os.remove in os.supports_dir_fd:
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    else:
+        dir_fd = None
+        matching_files = (f'{directory}/{filepath}' for filepath in matching_files)
+
+    # One task per batch of files rather than per file, so the dispatch overhead is
+    #   paid once every RM_BATCH_SIZE deletes instead of on each of them
+    batches = iter(lambda: list(islice(matching_files, RM_BATCH_SIZE)), [])
+    tasks = (delayed(_remove_files_batch)(batch, dir_fd) for batch in batches)
+
+    # Parallel deletion using threading backend. Tasks are already batched, so joblib's own
+    #   auto-batching is turned off, and only 2 tasks per thread are taken from the scan ahead
+    #   of the deletions.
+    attempted_count = 0
+    failures = []
+    try:
+        with tqdm(desc="Removing files", unit="file") as pbar:
+            for n_attempted, batch_failures in Parallel(
+                n_jobs=n_jobs, backend='threading', return_as='generator_unordered',
+                batch_size=1, pre_dispatch='2*n_jobs'
+            )(tasks):
+                attempted_count += n_attempted
+                failures.extend(batch_failures)
+                pbar.update(n_attempted)
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
+
+    if not attempted_count:
+        print(f"No files found containing {patterns}")
         return 0, 0, []
 
-    print(f"Removing {len(matching_files):,} files using {n_jobs} threads...")
-
-    # Parallel deletion using threading backend
-    results = Parallel(n_jobs=n_jobs, backend='threading')(
-        delayed(_remove_single_file)(f'{directory}/{filepath}')
-        for filepath in tqdm(matching_files, desc="Removing files")
-    )
-
-    # Count successes and failures
-    success_count = sum(1 for _, success, _ in results if success)
-    failures = [(filepath, error) for filepath, success, error in results if not success]
+    success_count = attempted_count - len(failures)
 
     print(f"\nRemoval complete:")
     print(f"  - Successfully removed: {success_count:,} files")
@@ -1,20 +1,23 @@
-import os
-import re
 import numpy as np
 import pandas as pd
 import xarray as xr
+import rasterio
 import rioxarray as rxr
 import plotnine as p9
+import matplotlib
+matplotlib.use('Agg')  # figures are only saved to file, never shown
 import matplotlib.pyplot as plt
 from matplotlib.colors import TwoSlopeNorm
+from matplotlib.figure import Figure
 
 from pathlib import Path
 from tqdm.auto import tqdm
-from glob import glob
 from functools import partial
+from joblib import Parallel, delayed
 
 from tools import get_downloading_coords, get_plot_simulation
-from tools.parameter import SPECIES_GEOMETRY
+from tools.XML2Data import export_to_geotiff_with_band_names
+from tools.parameter import SPECIES_GEOMETRY, CARBON_CSV_COORDS
 
 
 ################################################################
@@ -23,12 +26,15 @@ from tools.parameter import SPECIES_GEOMETRY
 
 RES_factor = 1
 scrap_coords = get_downloading_coords(resfactor=3, include_region='LUTO')
-LUTO_lumap   = rxr.open_rasterio('data/lumap.tif', masked=True)
+# Only LUTO's CRS/transform are used (for the component rasters); read them once from the
+#   header, which also keeps the raster itself out of the species worker processes
+with rasterio.open('data/lumap.tif') as src:
+    LUTO_CRS, LUTO_TRANSFORM = src.crs, src.transform
 
 # 1 000 random sample coords used for violin/scatter comparisons
-compare_coords   = scrap_coords.sample(n=1000, random_state=42).set_index(['x', 'y']).index.tolist()
-compare_coords_x = xr.DataArray([c[0] for c in compare_coords], dims='points')
-compare_coords_y = xr.DataArray([c[1] for c in compare_coords], dims='points')
+compare_coords   = scrap_coords.sample(n=1000, random_state=42)[['x', 'y']].to_numpy()
+compare_coords_x = xr.DataArray(compare_coords[:, 0], dims='points')
+compare_coords_y = xr.DataArray(compare_coords[:, 1], dims='points')
 
 v2020_path       = Path('N:/Data-Master/FullCAM/Output_layers')
 comparison_dir   = Path('data/processed/Compare_API_and_Assemble_Data_Simulations')
@@ -39,6 +45,7 @@ get_plot_simulation = partial(get_plot_simulation, download_csv_dir=download_csv
 compare_year     = 2100
 v2020_extra_case = 'ld'     # 'ld' or 'hd' — applies to Belt categories
 CO2_FACTOR       = 44 / 12  # tC/ha → tCO2/ha
+SPECIES_N_JOBS   = 4        # species comparisons run in parallel (memory-bound)
 
 # (specId, specCat) → (v2020_name, v2020_cat)
 V2020_MAP = {
@@ -51,26 +58,179 @@ V2020_MAP = {
     (23, 'BlockES'): ('mal',   'block'),
 }
 
+# v2020 layer files are `{v2020_name}_{v2020_cat}_c_{component}.tif`
+V2020_COMPONENTS = ('debris', 'trees', 'soil')
+
+# API CSV carbon column → cache/v2020 VARIABLE
+API_CARBON_COLUMNS = {
+    'C mass of plants  (tC/ha)': 'TREE_C_HA',
+    'C mass of debris  (tC/ha)': 'DEBRIS_C_HA',
+    'C mass of soil  (tC/ha)':   'SOIL_C_HA',
+}
+
 MAP_COMPONENTS = [
     ('TREE_C_HA',   'Trees'),
     ('DEBRIS_C_HA', 'Debris'),
     ('SOIL_C_HA',   'Soil'),
 ]
 
+FIG6_VMAX_ABS  = 1200     # fixed colour scale for the v2020 and v2024 map columns
+FIG6_VMAX_DIFF =  600     # fixed symmetric scale for the difference column
+
 
 ################################################################
 #                    Comparison function                       #
 ################################################################
 
+def read_api_csv(f, lon, lat):
+    """Read the `compare_year` carbon of one downloaded API CSV, tagged with its lon/lat."""
+    # Parse only the needed columns, carbon straight to float32
+    df_api = pd.read_csv(
+        f,
+        usecols=['Year', *API_CARBON_COLUMNS],
+        dtype={'Year': np.int32, **dict.fromkeys(API_CARBON_COLUMNS, np.float32)},
+        engine='c',
+    ).rename(columns=API_CARBON_COLUMNS)
+    # Soil gap: subtract first-year value so it matches the cache/v2020 convention
+    df_api['SOIL_C_HA'] = df_api['SOIL_C_HA'] - df_api['SOIL_C_HA'].iloc[0]
+    # Keep only the compared year, so the concatenated frame holds one row per file
+    df_api = df_api[df_api['Year'].to_numpy() == compare_year]
+    return df_api.assign(lon=lon, lat=lat)
+
+
+
+def read_v2020_band(path, band):
+    """One band (1-based) of a v2020 layer as float32, with nodata as NaN."""
+    with rasterio.open(path) as src:
+        return src.read(band, masked=True).astype(np.float32).filled(np.nan)
+
+
+def plot_density_facets(df, x, y, title, xlabel, ylabel, out_path):
+    """Save one 2D-histogram panel of `df[x]` vs `df[y]` per VARIABLE, each with a dashed y=x.
+
+    Thousands of points per panel, so their density is drawn (one cell per bin, not per
+    point), with matplotlib directly rather than through plotnine's per-layer frame work.
+    """
+    groups = list(df.groupby('VARIABLE'))
+    fig, axes = plt.subplots(1, len(groups), figsize=(10, 6), squeeze=False, constrained_layout=True)
+    for ax, (var, grp) in zip(axes[0], groups):
+        xs, ys = grp[x].to_numpy(), grp[y].to_numpy()
+        valid = np.isfinite(xs) & np.isfinite(ys)
+        ax.hist2d(xs[valid], ys[valid], bins=60, cmin=1)
+        ax.axline((0, 0), slope=1, color='red', linestyle='--')
+        ax.set_title(var)
+    fig.suptitle(title)
+    fig.supxlabel(xlabel)
+    fig.supylabel(ylabel)
+    fig.savefig(out_path, dpi=150)
+    plt.close(fig)
+
+
+def plot_map(ax, cbar_label, **imshow_kwargs):
+    """Add an empty map image plus its colorbar to `ax`; fill it with `set_data`/`set_extent`.
+
+    `DataArray.plot` draws a pcolormesh quad per cell; the grids here are regular, so
+    `imshow` over the cell-edge extent gives the same map far faster.
+    """
+    im = ax.imshow(np.full((1, 1), np.nan), interpolation='nearest', aspect='auto', **imshow_kwargs)
+    ax.figure.colorbar(im, ax=ax, shrink=0.8, label=cbar_label)
+    return im
+
+
+def grid_extent(x, y):
+    """`imshow` extent `[left, right, bottom, top]` of the cell edges of a regular grid."""
+    half_dx = abs(float(x[1] - x[0])) / 2
+    half_dy = abs(float(y[1] - y[0])) / 2
+    return [x.min() - half_dx, x.max() + half_dx, y.min() - half_dy, y.max() + half_dy]
+
+
+def make_fig6():
+    """A new 3x3 fig6 map grid (rows: MAP_COMPONENTS; columns: v2020, v2024, difference).
+
+    The layout, titles and fixed colour scales are set here; the caller fills the images
+    with `set_data`/`set_extent`. The figure is a plain `Figure`, not registered with pyplot,
+    so nothing keeps it (or its images) alive once the species task that drew it returns.
+
+    Returns
+    -------
+    fig6 : matplotlib.figure.Figure
+    ims : list of tuple
+        Per MAP_COMPONENTS row, the (v2020, v2024, difference) images to fill
+    """
+    fig6 = Figure(figsize=(18, 13), layout='constrained')
+    axes = fig6.subplots(3, 3)
+    norm_diff = TwoSlopeNorm(vmin=-FIG6_VMAX_DIFF, vcenter=0, vmax=FIG6_VMAX_DIFF)
+
+    ims = []
+    for row_idx, (_, comp_label) in enumerate(MAP_COMPONENTS):
+        ims.append((
+            plot_map(axes[row_idx, 0], 'tCO2/ha', cmap='YlOrRd', vmin=0, vmax=FIG6_VMAX_ABS),
+            plot_map(axes[row_idx, 1], 'tCO2/ha', cmap='YlOrRd', vmin=0, vmax=FIG6_VMAX_ABS),
+            plot_map(axes[row_idx, 2], 'Δ tCO2/ha', cmap='RdBu_r', norm=norm_diff),
+        ))
+        axes[row_idx, 0].set_ylabel(comp_label, fontsize=11, fontweight='bold')
+
+    axes[0, 0].set_title('v2020', fontsize=12, fontweight='bold')
+    axes[0, 1].set_title('v2024', fontsize=12, fontweight='bold')
+    axes[0, 2].set_title('Difference  (v2024 − v2020)\nred = v2024 higher  |  blue = v2020 higher',
+                         fontsize=10, fontweight='bold')
+    return fig6, ims
+
+
+def is_up_to_date(out_path, *src_paths):
+    """True if `out_path` exists and is newer than every file in `src_paths`."""
+    return out_path.exists() and out_path.stat().st_mtime >= max(Path(p).stat().st_mtime for p in src_paths)
+
+
+def load_api_carbon(spec_id, spec_cat):
+    """Tidy `compare_year` carbon of all downloaded API CSVs for one (specId, specCat).
+
+    The tidy frame is saved to `comparison_dir` and reused while it is newer than both
+    `download_csv_dir` (whose mtime changes when a CSV is added or removed) and each of the
+    species' CSVs (whose mtimes change when one is rewritten in place). Delete the saved
+    `api_carbon_*.csv` to force a rebuild.
+    """
+    # Match the species/category in the glob itself (the trailing `_` keeps e.g. 'Block'
+    #   from also matching 'BlockES') rather than listing every CSV and filtering after
+    csv_files = [str(f) for f in download_csv_dir.glob(f'df_*_specId_{spec_id}_specCat_{spec_cat}_*.csv')]
+    if not csv_files:
+        return pd.DataFrame()
+
+    cache_path = comparison_dir / f'api_carbon_specId_{spec_id}_specCat_{spec_cat}_Year_{compare_year}.csv'
+    if is_up_to_date(cache_path, download_csv_dir, *csv_files):
+        return pd.read_csv(cache_path, dtype={'Year': np.int32, 'data_api': np.float32})
+
+    csv_coords = (
+        pd.Series(csv_files, dtype=str)
+        .str.extract(CARBON_CSV_COORDS)
+        .astype(float)
+        .to_numpy()
+    )
+
+    # Read the API CSVs in parallel and concatenate once, then melt the whole frame in one go
+    tasks = [delayed(read_api_csv)(f, lon, lat) for f, (lon, lat) in zip(csv_files, csv_coords)]
+    df_apis = [
+        df_api for df_api in tqdm(
+            Parallel(n_jobs=-1, backend='threading', return_as='generator')(tasks),
+            total=len(tasks), desc='Reading CSVs', leave=False,
+        )
+    ]
+    df_api = pd.concat(df_apis, ignore_index=True).melt(
+        id_vars=['Year', 'lon', 'lat'], var_name='VARIABLE', value_name='data_api'
+    )
+    df_api.to_csv(cache_path, index=False)
+    return df_api
+
+
 def run_species_comparison(spec_id, spec_cat):
     """Run all v2020-vs-v2024 comparisons for one (specId, specCat) pair.
 
     Produces:
       - fig1: API vs Cache scatter (only if CSV downloads exist)
       - fig2: Cache vs v2020 scatter (only if CSV downloads exist)
-      - ratio_layer_*.tif: per-variable v2024/v2020 ratio rasters
+      - ratio_layer_*.tif: v2024/v2020 ratio raster, bands TREE_C_HA, DEBRIS_C_HA, SOIL_C_HA
       - fig3: v2024 component violin/box
-      - componet_layer_*.tif: per-component fraction rasters
+      - componet_layer_*.tif: component fraction (%) raster, bands Trees, Debris, Soil
       - fig6: 3x3 spatial CO2 map (v2020 | v2024 | Difference)
     """
     if (spec_id, spec_cat) not in V2020_MAP:
@@ -78,9 +238,10 @@ def run_species_comparison(spec_id, spec_cat):
         return
 
     v2020_name, v2020_cat = V2020_MAP[(spec_id, spec_cat)]
-    v2020_debris_layer = v2020_path / f'{v2020_name}_{v2020_cat}_c_debris.tif'
-    v2020_tree_layer   = v2020_path / f'{v2020_name}_{v2020_cat}_c_trees.tif'
-    v2020_soil_layer   = v2020_path / f'{v2020_name}_{v2020_cat}_c_soil.tif'
+    v2020_debris_layer, v2020_tree_layer, v2020_soil_layer = (
+        v2020_path / f'{v2020_name}_{v2020_cat}_c_{component}.tif'
+        for component in V2020_COMPONENTS
+    )
 
     print(f"\n{'='*60}")
     print(f"specId={spec_id}  specCat={spec_cat}  →  v2020: {v2020_name}_{v2020_cat}")
@@ -92,109 +253,106 @@ def run_species_comparison(spec_id, spec_cat):
         print(f"  Cache not found: {cache_path} — skipping.")
         return
     
-    # Soil: gap relative to first year (use concat to avoid in-place assignment on dask arrays)
-    ds_cache = xr.open_dataset(cache_path, chunks={})['data']
-    soil_gap = (
-        ds_cache.sel(VARIABLE='SOIL_C_HA', drop=True)
-        - ds_cache.sel(VARIABLE='SOIL_C_HA', drop=True).isel(YEAR=0, drop=True)
-    ).expand_dims({'VARIABLE': ['SOIL_C_HA']})
-    other_vars = [v for v in ds_cache.VARIABLE.values if v != 'SOIL_C_HA']
-    ds_cache = xr.concat([ds_cache.sel(VARIABLE=other_vars), soil_gap], dim='VARIABLE')
-    ds_cache = ds_cache.sel(YEAR=compare_year).compute()
+    # Only the first year (soil baseline) and the compared year are read, rather than building
+    #   the soil gap over every year before selecting one; no dask, the lazy backend indexing
+    #   already reads just those two slices
+    with xr.open_dataset(cache_path) as ds:
+        first_year = ds['YEAR'].values[0]
+        ds_cache = ds['data'].sel(YEAR=[first_year, compare_year]).astype(np.float32).load()
+    # Soil: gap relative to first year (in place, now that the two years are in memory)
+    ds_cache.loc[dict(VARIABLE='SOIL_C_HA', YEAR=compare_year)] -= ds_cache.sel(VARIABLE='SOIL_C_HA', YEAR=first_year).values
+    ds_cache = ds_cache.sel(YEAR=compare_year)
 
     # ── Load v2020 layers ─────────────────────────────────────────────
-    Debries_C = rxr.open_rasterio(v2020_debris_layer, masked=True, chunks={})
-    Trees_C   = rxr.open_rasterio(v2020_tree_layer,   masked=True, chunks={})
-    Soil_C    = rxr.open_rasterio(v2020_soil_layer,   masked=True, chunks={})
-
-    Debries_C_sel = Debries_C.sel(band=91, drop=True).compute()  # band 91 = year 2100
-    Trees_C_sel   = Trees_C.sel(band=91, drop=True).compute()
-    Soil_C_sel    = (Soil_C.sel(band=91, drop=True) - Soil_C.isel(band=0, drop=True)).compute()
-
+    # The three layers share one grid; CRS/transform/shape come from the file header
+    with rasterio.open(v2020_debris_layer) as src:
+        v2020_crs, v2020_transform = src.crs, src.transform
+        v2020_height, v2020_width = src.height, src.width
+
+    # Decode only the bands used, straight into one preallocated float32 stack
+    v2020_bands = np.empty((3, v2020_height, v2020_width), dtype=np.float32)
+    v2020_bands[0] = read_v2020_band(v2020_debris_layer, 91)    # band 91 = year 2100
+    v2020_bands[1] = read_v2020_band(v2020_tree_layer, 91)
+    v2020_bands[2] = read_v2020_band(v2020_soil_layer, 91)
+    v2020_bands[2] -= read_v2020_band(v2020_soil_layer, 1)      # soil gap to the first year
+
+    # Pixel-centre coords, as `rxr.open_rasterio` would give them
     ds_v2020 = xr.DataArray(
-        data=np.stack([Debries_C_sel.data, Trees_C_sel.data, Soil_C_sel.data], axis=0),
-        dims=['VARIABLE', 'y', 'x'],
+        v2020_bands,
+        dims=('VARIABLE', 'y', 'x'),
         coords={
             'VARIABLE': ['DEBRIS_C_HA', 'TREE_C_HA', 'SOIL_C_HA'],
-            'y': Trees_C_sel.y,
-            'x': Soil_C_sel.x,
+            'y': v2020_transform.f + (np.arange(v2020_height) + 0.5) * v2020_transform.e,
+            'x': v2020_transform.c + (np.arange(v2020_width) + 0.5) * v2020_transform.a,
         },
     )
 
+    # Put v2020 on the cache grid; cells more than half a pixel from any v2020 cell become NaN.
+    #   Only x/y are reindexed: 'nearest' needs a monotonic index, which VARIABLE is not
+    half_pixel = abs(float(ds_cache['x'][1] - ds_cache['x'][0])) / 2
+    ds_v2020 = ds_v2020.reindex(
+        x=ds_cache['x'].values, y=ds_cache['y'].values, method='nearest', tolerance=half_pixel
+    )
+
     # ── API vs Cache vs v2020 scatter (fig1, fig2) ────────────────────
-    csv_files = [
-        f for f in glob(f'{download_csv_dir}/*.csv')
-        if f'specId_{spec_id}_specCat_{spec_cat}' in f
-    ]
-    df_comparison = pd.DataFrame()
-    for f in tqdm(csv_files, desc='Reading CSVs', leave=False):
-        df_api = pd.read_csv(f)[['Year', 'C mass of plants  (tC/ha)', 'C mass of debris  (tC/ha)', 'C mass of soil  (tC/ha)']]
-        df_api = df_api.rename(columns={
-            'C mass of plants  (tC/ha)': 'TREE_C_HA',
-            'C mass of debris  (tC/ha)': 'DEBRIS_C_HA',
-            'C mass of soil  (tC/ha)':   'SOIL_C_HA',
-        })
-        # Soil gap: subtract first-year value so it matches the cache/v2020 convention
-        df_api['SOIL_C_HA'] = df_api['SOIL_C_HA'] - df_api['SOIL_C_HA'].iloc[0]
-        df_api = df_api.query(f'Year == {compare_year}').melt(
-            id_vars=['Year'], var_name='VARIABLE', value_name='data_api'
-        )
-        lon, lat = re.findall(r'df_(-?\d+\.\d+)_(-?\d+\.\d+)_specId_', os.path.basename(f))[0]
-        lon, lat = float(lon), float(lat)
-        df_cache_pt = (
-            ds_cache.sel(x=lon, y=lat, method='nearest')
-            .to_dataframe().reset_index()
-            .rename(columns={'YEAR': 'Year', 'data': 'data_cache'})[['VARIABLE', 'data_cache']]
-        )
-        df_v2020_pt = (
-            ds_v2020.sel(x=lon, y=lat, method='nearest')
-            .to_dataframe('data_v2020').reset_index()[['VARIABLE', 'data_v2020']]
-        )
-        df_combine = df_api.merge(df_cache_pt, on='VARIABLE').merge(df_v2020_pt, on='VARIABLE')
-        df_combine[['lon', 'lat']] = lon, lat
-        df_comparison = pd.concat([df_comparison, df_combine], ignore_index=True)
+    df_comparison = load_api_carbon(spec_id, spec_cat)
 
     if not df_comparison.empty:
-        p9.options.figure_size = (10, 6)
-        p9.options.dpi = 100
-
-        fig1 = (
-            p9.ggplot(df_comparison)
-            + p9.geom_point(p9.aes(x='data_api', y='data_cache'), size=0.5, alpha=0.3)
-            + p9.facet_wrap('~VARIABLE', scales='free')
-            + p9.geom_abline(slope=1, intercept=0, color='red', linetype='dashed')
-            + p9.labs(
-                title=f'Carbon Comparison at Year {compare_year} (API vs Cache)',
-                x='Carbon from API (tC/ha)', y='Carbon from Cache (tC/ha)',
-            )
+        # Sample cache and v2020 at all CSV points in one vectorised selection each, instead
+        #   of one nearest-neighbour `.sel` per file. Both are on the same grid (aligned
+        #   above), so the nearest cell positions are looked up once and shared.
+        #   Several CSVs (e.g. scenarios) can share a point, so each point is sampled once.
+        sample_coords = np.unique(df_comparison[['lon', 'lat']].to_numpy(), axis=0)
+        sample_ix = xr.DataArray(ds_cache.indexes['x'].get_indexer(sample_coords[:, 0], method='nearest'), dims='points')
+        sample_iy = xr.DataArray(ds_cache.indexes['y'].get_indexer(sample_coords[:, 1], method='nearest'), dims='points')
+        df_samples = xr.Dataset({
+            'data_cache': ds_cache.isel(x=sample_ix, y=sample_iy).reset_coords(drop=True),
+            'data_v2020': ds_v2020.isel(x=sample_ix, y=sample_iy).reset_coords(drop=True),
+        }).assign_coords(
+            lon=('points', sample_coords[:, 0]),
+            lat=('points', sample_coords[:, 1]),
+        ).to_dataframe().reset_index().set_index(['lon', 'lat', 'VARIABLE'])[['data_cache', 'data_v2020']]
+
+        # Many-to-one lookup on the unique sample keys; cheaper than a merge's hash join
+        df_comparison[['data_cache', 'data_v2020']] = df_samples.reindex(
+            pd.MultiIndex.from_frame(df_comparison[['lon', 'lat', 'VARIABLE']])
+        ).to_numpy()
+
+        plot_density_facets(
+            df_comparison, 'data_api', 'data_cache',
+            title=f'Carbon Comparison at Year {compare_year} (API vs Cache)',
+            xlabel='Carbon from API (tC/ha)', ylabel='Carbon from Cache (tC/ha)',
+            out_path=comparison_dir / f'{v2020_name}_{spec_cat}_Compare_API_V.S_Cache.png',
         )
-        fig1.save(comparison_dir / f'{v2020_name}_{spec_cat}_Compare_API_V.S_Cache.svg', dpi=300)
-
-        fig2 = (
-            p9.ggplot(df_comparison)
-            + p9.geom_point(p9.aes(x='data_cache', y='data_v2020'), size=0.5, alpha=0.3)
-            + p9.facet_wrap('~VARIABLE', scales='free')
-            + p9.geom_abline(slope=1, intercept=0, color='red', linetype='dashed')
-            + p9.labs(
-                title=f'Carbon Comparison at Year {compare_year} (Cache vs v2020)',
-                x='FullCam v2024 (tC/ha)', y='FullCam v2020 (tC/ha)',
-            )
-        )
-        fig2.save(comparison_dir / f'{v2020_name}_{spec_cat}_v2024_V.S_{v2020_name}_{v2020_cat}_v2020.svg', dpi=300)
-
-    # ── Align coords then compute ratio rasters ───────────────────────
-    ds_v2020['x'] = ds_cache['x']
-    ds_v2020['y'] = ds_cache['y']
-
-    diff_ratio = ds_cache / ds_v2020
-    diff_ratio.rio.write_crs(Debries_C.rio.crs, inplace=True)
-    diff_ratio.rio.write_transform(Debries_C.rio.transform(), inplace=True)
-    for var in diff_ratio['VARIABLE'].values:
-        diff_ratio.sel(VARIABLE=var).rio.to_raster(
-            comparison_dir / f'ratio_layer_{v2020_name}_{spec_cat}_v2024_V.S_{v2020_name}_{v2020_cat}_v2020_{var}.tif',
-            compress='LZW',
+        plot_density_facets(
+            df_comparison, 'data_cache', 'data_v2020',
+            title=f'Carbon Comparison at Year {compare_year} (Cache vs v2020)',
+            xlabel='FullCam v2024 (tC/ha)', ylabel='FullCam v2020 (tC/ha)',
+            out_path=comparison_dir / f'{v2020_name}_{spec_cat}_v2024_V.S_{v2020_name}_{v2020_cat}_v2020.png',
         )
 
+    # ── Ratio rasters ─────────────────────────────────────────────────
+    # Rasters are only rebuilt when missing or older than the data they are computed from.
+    #   Their writes are queued and run together below, so the LZW encodes (GIL released by
+    #   GDAL) overlap instead of running back to back
+    raster_writes = []
+    ratio_path = comparison_dir / f'ratio_layer_{v2020_name}_{spec_cat}_v2024_V.S_{v2020_name}_{v2020_cat}_v2020_Year_{compare_year}.tif'
+    if not is_up_to_date(ratio_path, cache_path, v2020_debris_layer, v2020_tree_layer, v2020_soil_layer):
+        # The grids already match (reindexed above), so divide the raw arrays instead of
+        #   aligning labels again; cells without v2020 carbon become NaN rather than inf.
+        #   Bands follow MAP_COMPONENTS (trees, debris, soil), the order the README documents.
+        ratio_vars = [v for v, _ in MAP_COMPONENTS]
+        v2024_ratio = ds_cache.sel(VARIABLE=ratio_vars)
+        v2020_vals = ds_v2020.sel(VARIABLE=ratio_vars).transpose(*v2024_ratio.dims).values
+        diff_ratio = v2024_ratio.copy(data=np.divide(
+            v2024_ratio.values, v2020_vals, out=np.full_like(v2024_ratio.values, np.nan), where=v2020_vals != 0
+        ))
+        diff_ratio.rio.write_crs(v2020_crs, inplace=True)
+        diff_ratio.rio.write_transform(v2020_transform, inplace=True)
+        raster_writes.append(delayed(export_to_geotiff_with_band_names)(
+            diff_ratio, str(ratio_path), band_dim='VARIABLE', predictor=3
+        ))
+
     # ── Component violin/box + fraction rasters (fig3) ───────────────
     ds_cache_sel = ds_cache.sel(x=compare_coords_x, y=compare_coords_y).to_dataframe().reset_index()
 
@@ -210,58 +368,45 @@ def run_species_comparison(spec_id, spec_cat):
     )
     fig3.save(comparison_dir / f'{v2020_name}_{spec_cat}_Componet_Boxplot_Year_{compare_year}.svg', dpi=300)
 
-    total_carbon = ds_cache.sum(dim='VARIABLE', skipna=False)
-    for ratio_da, name in zip(
-        [ds_cache.sel(VARIABLE='TREE_C_HA')   / total_carbon * 100,
-         ds_cache.sel(VARIABLE='DEBRIS_C_HA') / total_carbon * 100,
-         ds_cache.sel(VARIABLE='SOIL_C_HA')   / total_carbon * 100],
-        ['Tree', 'Debris', 'Soil'],
-    ):
-        ratio_da.rio.write_crs(LUTO_lumap.rio.crs, inplace=True)
-        ratio_da.rio.write_transform(LUTO_lumap.rio.transform(), inplace=True)
-        ratio_da.rio.to_raster(
-            comparison_dir / f'componet_layer_{v2020_name}_{spec_cat}_Componet_ratio_{name}_Year_{compare_year}.tif',
-            compress='LZW',
-        )
+    component_path = comparison_dir / f'componet_layer_{v2020_name}_{spec_cat}_Componet_ratio_Year_{compare_year}.tif'
+    if not is_up_to_date(component_path, cache_path):
+        # Every component's share of the total (%) in one NumPy division, done in place on the
+        #   component selection (already a copy); the x100 is folded into the total, and cells
+        #   with no carbon at all become NaN rather than inf
+        var_axis = ds_cache.get_axis_num('VARIABLE')
+        total_pct = ds_cache.values.sum(axis=var_axis, keepdims=True) / 100
+        component_ratio = ds_cache.sel(VARIABLE=[v for v, _ in MAP_COMPONENTS])
+        np.divide(component_ratio.values, total_pct, out=component_ratio.values, where=total_pct != 0)
+        np.copyto(component_ratio.values, np.nan, where=total_pct == 0)
+        component_ratio['VARIABLE'] = [label for _, label in MAP_COMPONENTS]
+        component_ratio.rio.write_crs(LUTO_CRS, inplace=True)
+        component_ratio.rio.write_transform(LUTO_TRANSFORM, inplace=True)
+        # All components in one tiled multi-band file instead of one GDAL write per component
+        raster_writes.append(delayed(export_to_geotiff_with_band_names)(
+            component_ratio, str(component_path), band_dim='VARIABLE', predictor=3
+        ))
+
+    if raster_writes:
+        Parallel(n_jobs=len(raster_writes), backend='threading')(raster_writes)
 
     # ── Spatial CO2 maps: v2020 | v2024 | Difference (fig6) ──────────
-    fig6, axes = plt.subplots(3, 3, figsize=(18, 13), constrained_layout=True)
-
-    VMAX_ABS  = 1200   # fixed colour scale for v2020 and v2024 columns
-    VMAX_DIFF =  600   # fixed symmetric scale for the difference column
-
-    for row_idx, (var, comp_label) in enumerate(MAP_COMPONENTS):
-        da_v2020_co2 = ds_v2020[:, ::5, ::5].sel(VARIABLE=var) * CO2_FACTOR
-        da_v2024_co2 = ds_cache[::5, ::5, :].sel(VARIABLE=var) * CO2_FACTOR
-
-        da_diff_co2 = da_v2020_co2 * np.nan
-        da_diff_co2.values = da_v2024_co2.values - da_v2020_co2.values
-
-        ax = axes[row_idx, 0]
-        da_v2020_co2.plot(ax=ax, cmap='YlOrRd', vmin=0, vmax=VMAX_ABS,
-                          add_labels=False, cbar_kwargs={'label': 'tCO2/ha', 'shrink': 0.8})
-        if row_idx == 0:
-            ax.set_title('v2020', fontsize=12, fontweight='bold')
-        ax.set_ylabel(comp_label, fontsize=11, fontweight='bold')
-        ax.set_xlabel('')
-
-        ax = axes[row_idx, 1]
-        da_v2024_co2.plot(ax=ax, cmap='YlOrRd', vmin=0, vmax=VMAX_ABS,
-                          add_labels=False, cbar_kwargs={'label': 'tCO2/ha', 'shrink': 0.8})
-        if row_idx == 0:
-            ax.set_title('v2024', fontsize=12, fontweight='bold')
-        ax.set_ylabel('')
-        ax.set_xlabel('')
-
-        ax = axes[row_idx, 2]
-        norm = TwoSlopeNorm(vmin=-VMAX_DIFF, vcenter=0, vmax=VMAX_DIFF)
-        da_diff_co2.plot(ax=ax, cmap='RdBu_r', norm=norm,
-                         add_labels=False, cbar_kwargs={'label': 'Δ tCO2/ha', 'shrink': 0.8})
-        if row_idx == 0:
-            ax.set_title('Difference  (v2024 − v2020)\nred = v2024 higher  |  blue = v2020 higher',
-                         fontsize=10, fontweight='bold')
-        ax.set_ylabel('')
-        ax.set_xlabel('')
+    # Every 5th cell, northernmost row first (images are drawn top row first). v2020 was put on
+    #   the cache grid above, so the grid is thinned once and each component is taken by
+    #   position from plain arrays instead of a label lookup per panel
+    y_step = 5 if ds_cache['y'][0] > ds_cache['y'][-1] else -5
+    map_extent = grid_extent(ds_cache['x'].values[::5], ds_cache['y'].values[::y_step])
+    v2020_maps = ds_v2020.transpose('VARIABLE', 'y', 'x').values[:, ::y_step, ::5] * CO2_FACTOR
+    v2024_maps = ds_cache.transpose('VARIABLE', 'y', 'x').values[:, ::y_step, ::5] * CO2_FACTOR
+    v2020_idx = {var: i for i, var in enumerate(ds_v2020['VARIABLE'].values)}
+    v2024_idx = {var: i for i, var in enumerate(ds_cache['VARIABLE'].values)}
+
+    fig6, fig6_ims = make_fig6()
+    for (var, _), (im_v2020, im_v2024, im_diff) in zip(MAP_COMPONENTS, fig6_ims):
+        v2020_co2 = v2020_maps[v2020_idx[var]]
+        v2024_co2 = v2024_maps[v2024_idx[var]]
+        for im, values in ((im_v2020, v2020_co2), (im_v2024, v2024_co2), (im_diff, v2024_co2 - v2020_co2)):
+            im.set_data(values)
+            im.set_extent(map_extent)
 
     fig6.suptitle(
         f'CO2 Stock Maps: v2020 vs v2024  —  {v2020_name} ({spec_cat})  |  Year {compare_year}\n'
@@ -272,7 +417,6 @@ def run_species_comparison(spec_id, spec_cat):
         comparison_dir / f'{v2020_name}_{spec_cat}_Map_SideBySide_CO2_v2020_v2024_Year_{compare_year}.png',
         dpi=150, bbox_inches='tight',
     )
-    plt.close(fig6)
     print(f"  Saved: {v2020_name}_{spec_cat}_Map_SideBySide_CO2_v2020_v2024_Year_{compare_year}.png")
 
 
@@ -280,6 +424,12 @@ def run_species_comparison(spec_id, spec_cat):
 #            Loop over all species and categories              #
 ################################################################
 
-for SPECIES_ID, specCats in SPECIES_GEOMETRY.items():
-    for SPECIES_CAT in specCats:
-        run_species_comparison(SPECIES_ID, SPECIES_CAT)
+# Each (specId, specCat) reads and writes its own files, so they run in separate processes;
+#   every worker holds a full cache slice and v2020 stack, hence the small worker count
+tasks = [
+    delayed(run_species_comparison)(SPECIES_ID, SPECIES_CAT)
+    for SPECIES_ID, specCats in SPECIES_GEOMETRY.items()
+    for SPECIES_CAT in specCats
+]
+for _ in tqdm(Parallel(n_jobs=SPECIES_N_JOBS, return_as='generator_unordered')(tasks), total=len(tasks)):
+    pass
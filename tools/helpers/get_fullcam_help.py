@@ -1,7 +1,15 @@
+import os
+import html
+import json
 import time
+import hashlib
 import requests
+import lxml.html
 
-from bs4 import BeautifulSoup
+from urllib.parse import urljoin
+from lxml.etree import ParserError
+from urllib3.util.retry import Retry
+from requests.adapters import HTTPAdapter
 from joblib import Parallel, delayed
 
 # URL to title mapping from the Table of Contents
@@ -337,6 +345,26 @@ urls = [
     "https://www.dcceew.gov.au/themes/custom/awe/fullcam/Help-FullCAM2024/14_Credits.htm",
 ]
 
+# (idx, url, page_title) of every page, worked out once; the title comes from the mapping,
+#   falling back to the cleaned filename
+PAGES = tuple(
+    (idx, url, url_titles.get(filename, filename.replace('_', ' ').replace('.htm', '')))
+    for idx, url in enumerate(urls, 1)
+    for filename in [url.rsplit('/', 1)[-1]]
+)
+
+HELP_BASE_URL = "https://www.dcceew.gov.au/themes/custom/awe/fullcam/Help-FullCAM2024/"
+
+# Links that are already absolute, or point within the page / out of the web
+ABSOLUTE_URL_PREFIXES = ('http://', 'https://', '#', 'mailto:', 'javascript:', 'data:')
+
+def absolutize_url(url):
+    """Absolute URL of a link on a help page (relative to the help site or its host)"""
+    if url.startswith(ABSOLUTE_URL_PREFIXES):
+        return url
+    # Resolves host-relative ('/x'), protocol-relative ('//host/x') and '../' paths too
+    return urljoin(HELP_BASE_URL, url)
+
 def extract_content_from_html(html_content, debug=False):
     """Extract main content from HTML page, preserving HTML structure
 
@@ -344,97 +372,110 @@ def extract_content_from_html(html_content, debug=False):
     with Server Side Includes for header/footer. The actual content is everything
     in the HTML, so we just need to get it all and clean it up.
     """
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    # Remove script, style, and navigation elements
-    for element in soup(['script', 'style', 'nav', 'iframe']):
-        element.decompose()
-
-    # Remove HTML comments (including SSI directives)
-    for comment in soup.find_all(string=lambda text: isinstance(text, str) and '<!--' in str(text)):
-        comment.extract()
-
-    # For these simple HTML files, the body contains everything we need
-    # If there's no body tag, the soup itself is the content
-    content = soup.find('body') if soup.find('body') else soup
-
-    if content:
-        # Convert relative links to absolute URLs
-        base_url = "https://www.dcceew.gov.au/themes/custom/awe/fullcam/Help-FullCAM2024/"
-
-        # Fix all <a> tags with href attributes
-        for link in content.find_all('a', href=True):
-            href = link['href']
-            # Only convert relative URLs (not absolute URLs or anchors)
-            if not href.startswith(('http://', 'https://', '#', 'mailto:')):
-                # Handle relative paths
-                if href.startswith('/'):
-                    link['href'] = 'https://www.dcceew.gov.au' + href
-                else:
-                    link['href'] = base_url + href
-                # Open external links in new tab
-                link['target'] = '_blank'
-
-        # Fix all <img> tags with src attributes
-        for img in content.find_all('img', src=True):
-            src = img['src']
-            # Only convert relative URLs
-            if not src.startswith(('http://', 'https://', 'data:')):
-                if src.startswith('/'):
-                    img['src'] = 'https://www.dcceew.gov.au' + src
-                else:
-                    img['src'] = base_url + src
-
-        # Get all the HTML content
-        result = str(content)
-
-        # If result is too short or empty, it might mean the page structure is different
-        if len(result.strip()) < 50:
-            # Fall back to getting all HTML
-            result = str(soup)
-
-        return result
-
-    return ""
-
-def download_single_page(idx, url, session):
+    # Parse straight into an lxml tree (no BeautifulSoup layer on top); lxml wraps bare
+    #   fragments in <html><body>, so the SSI-laced pages here always come back with a body.
+    #   HTML comments (including SSI directives) are dropped by the parser itself; it is made
+    #   per call, as lxml parsers must not be shared between the download threads
+    try:
+        content = lxml.html.document_fromstring(
+            html_content, parser=lxml.html.HTMLParser(remove_comments=True)
+        ).body
+    except ParserError:     # nothing but whitespace/comments
+        return ""
+
+    # Remove script, style, and navigation elements (their tail text is kept)
+    for element in content.xpath('.//script|.//style|.//nav|.//iframe'):
+        element.drop_tree()
+
+    # Open the page links that are relative (converted below) in a new tab
+    for link in content.iterfind('.//a[@href]'):
+        if not link.get('href').startswith(ABSOLUTE_URL_PREFIXES):
+            link.set('target', '_blank')
+
+    # Convert relative links to absolute URLs, over every link attribute in one lxml pass
+    content.rewrite_links(absolutize_url)
+
+    # Get all the HTML content; only the body's children, as the page is nested in a <div>
+    return html.escape(content.text or '', quote=False) + ''.join(
+        lxml.html.tostring(child, encoding='unicode') for child in content
+    )
+
+# Downloaded pages; used as they are for HELP_CACHE_MAX_AGE seconds after being fetched or
+#   revalidated, then revalidated with the server (ETag/Last-Modified) instead of re-downloaded
+HELP_CACHE_DIR = 'data/processed/fullcam_help_pages'
+HELP_CACHE_MAX_AGE = 7 * 24 * 3600
+
+def fetch_page(url, session):
+    """GET a page, reusing the on-disk copy while it is fresh or when the server answers 304
+
+    Returns:
+        tuple: (status_code, content); a page served from the cache reports 200
+    """
+    key = hashlib.sha256(url.encode()).hexdigest()
+    body_path = f'{HELP_CACHE_DIR}/{key}.htm'
+    meta_path = f'{HELP_CACHE_DIR}/{key}.json'
+    cached = os.path.exists(body_path) and os.path.exists(meta_path)
+
+    # A recently fetched or revalidated page is used without asking the server at all
+    if cached and time.time() - os.path.getmtime(meta_path) < HELP_CACHE_MAX_AGE:
+        with open(body_path, 'rb') as f:
+            return 200, f.read()
+
+    # Conditional request if there is a cached copy to fall back on
+    headers = {}
+    if cached:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    # Fail fast on connecting, but give slow pages time to arrive
+    response = session.get(url, timeout=(5, 30), headers=headers)
+
+    if response.status_code == 304 and headers:
+        os.utime(meta_path)     # fresh again for another HELP_CACHE_MAX_AGE
+        with open(body_path, 'rb') as f:
+            return 200, f.read()
+
+    if response.status_code == 200:
+        with open(body_path, 'wb') as f:
+            f.write(response.content)
+        with open(meta_path, 'w') as f:
+            json.dump({
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+            }, f)
+
+    return response.status_code, response.content
+
+
+def download_single_page(idx, url, page_title, session):
     """Download a single page and return its content"""
     page_data = {
         'idx': idx,
         'url': url,
+        'title': page_title,
         'success': False,
         'content': None,
         'error': None
     }
 
     try:
-        response = session.get(url, timeout=15)
+        status_code, content = fetch_page(url, session)
 
-        if response.status_code == 200:
-            content_html = extract_content_from_html(response.content)
+        if status_code == 200:
+            content_html = extract_content_from_html(content)
 
             if content_html.strip():
-                # Get the filename from URL
-                filename = url.split('/')[-1]
-
-                # Use the proper title from the mapping, or fall back to cleaned filename
-                page_title = url_titles.get(filename, filename.replace('_', ' ').replace('.htm', ''))
-
-                section_id = f"page-{idx}"
-
-                page_section = f"""
-    <div class="page-section" id="{section_id}">
-        <div class="page-number">Page {idx} of {len(urls)}</div>
-        <h2 class="page-title">{page_title}</h2>
-        {content_html}
-    </div>
-"""
-                page_data['content'] = page_section
+                # Only the page's own HTML; the merger wraps it in its page section
+                page_data['content'] = content_html
                 page_data['success'] = True
             else:
                 page_data['error'] = 'Empty content'
         else:
-            page_data['error'] = f'Status: {response.status_code}'
+            page_data['error'] = f'Status: {status_code}'
 
     except requests.exceptions.Timeout:
         page_data['error'] = 'Timeout'
@@ -446,22 +487,8 @@ def download_single_page(idx, url, session):
     return page_data
 
 
-def download_and_merge_html(max_workers=100):
-    """Download all URLs concurrently and merge into a single HTML file
-
-    Args:
-        max_workers (int): Maximum number of concurrent downloads (default: 10)
-    """
-    print(f"Starting batch download of {len(urls)} pages with {max_workers} concurrent workers...")
-    start_time = time.time()
-
-    session = requests.Session()
-    session.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    })
-
-    # HTML header template
-    html_header = """<!DOCTYPE html>
+# HTML header of the merged file (static; the pages and footer follow it)
+HTML_HEADER = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -555,38 +582,77 @@ def download_and_merge_html(max_workers=100):
     <p style="text-align: center; color: #7f8c8d; margin-bottom: 40px;">Complete Reference Guide - All Pages Merged</p>
 """
 
+def download_and_merge_html(max_workers=None):
+    """Download all URLs concurrently and merge into a single HTML file
+
+    Args:
+        max_workers (int): Maximum number of concurrent downloads (default: one per page,
+            at most 32; the ceiling keeps the load on the dcceew.gov.au server reasonable)
+    """
+    if max_workers is None:
+        max_workers = min(32, len(urls))
+
+    print(f"Starting batch download of {len(urls)} pages with {max_workers} concurrent workers...")
+    start_time = time.time()
+
+    session = requests.Session()
+    # Accept-Encoding is left to requests: it already asks for gzip/deflate, plus br/zstd
+    #   whenever urllib3 has a decoder for them, so the body is always decodable
+    session.headers.update({
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+        'Accept': 'text/html',
+    })
+    # All pages are on one host and the session is shared by every worker thread; size its
+    #   keep-alive pool to the workers, otherwise urllib3 keeps only 10 connections and the
+    #   rest are closed after each request, paying a new TCP+TLS handshake per page.
+    #   pool_block caps the open sockets at that size. Dropped connections, rate limiting
+    #   (honouring Retry-After) and server errors are retried with backoff before a page fails
+    retry = Retry(
+        total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=['GET'], raise_on_status=False,
+    )
+    session.mount('https://', HTTPAdapter(
+        pool_connections=1, pool_maxsize=max_workers, pool_block=True, max_retries=retry
+    ))
+    os.makedirs(HELP_CACHE_DIR, exist_ok=True)
+
     # Download pages concurrently using joblib
     # Create tasks for parallel execution
-    tasks = [delayed(download_single_page)(idx, url, session)
-             for idx, url in enumerate(urls, 1)]
+    tasks = [delayed(download_single_page)(idx, url, page_title, session)
+             for idx, url, page_title in PAGES]
 
-    # Execute downloads in parallel
+    # Execute downloads in parallel; results come back in task order, i.e. already by idx
     page_results_list = Parallel(n_jobs=max_workers, backend='threading', verbose=10)(tasks)
 
-    # Convert list results to dictionary keyed by idx
-    page_results = {result['idx']: result for result in page_results_list}
-
     # Print summary of results
     for result in page_results_list:
         status = "✓" if result['success'] else f"✗ ({result['error']})"
         print(f"[{result['idx']}/{len(urls)}] {urls[result['idx']-1].split('/')[-1]} ... {status}")
 
-    # Sort results by index and build HTML
-    successful_downloads = 0
-    failed_downloads = 0
-    html_parts = [html_header]
-
-    for idx in sorted(page_results.keys()):
-        result = page_results[idx]
-        if result['success']:
-            html_parts.append(result['content'])
-            successful_downloads += 1
-        else:
-            failed_downloads += 1
-
-    # HTML footer
+    # Count the results up front, so the merged file can be written out in a single pass
+    successful_downloads = sum(result['success'] for result in page_results_list)
+    failed_downloads = len(page_results_list) - successful_downloads
     elapsed_time = time.time() - start_time
-    html_parts.append(f"""
+
+    # Write the combined HTML file: header, pages in index order, then footer, each part
+    #   straight into a 1 MiB write buffer rather than joined into one string first
+    html_filename = "FullCAM_Documentation_Complete.html"
+    try:
+        with open(f'tools/{html_filename}', 'w', encoding='utf-8', buffering=1024 * 1024) as f:
+            f.write(HTML_HEADER)
+
+            for result in page_results_list:
+                if result['success']:
+                    f.write(f"""
+    <div class="page-section" id="page-{result['idx']}">
+        <div class="page-number">Page {result['idx']} of {len(urls)}</div>
+        <h2 class="page-title">{result['title']}</h2>
+""")
+                    f.write(result['content'])
+                    f.write("\n    </div>\n")
+
+            # HTML footer
+            f.write(f"""
     <footer style="text-align: center; margin-top: 50px; padding: 20px; color: #7f8c8d; border-top: 1px solid #ddd;">
         <p>FullCAM Documentation compiled from dcceew.gov.au</p>
         <p>Pages successfully downloaded: {successful_downloads} / {len(urls)}</p>
@@ -594,12 +660,6 @@ def download_and_merge_html(max_workers=100):
     </footer>
 </body>
 </html>""")
-
-    # Write the combined HTML file
-    html_filename = "FullCAM_Documentation_Complete.html"
-    try:
-        with open(f'tools/{html_filename}', 'w', encoding='utf-8') as f:
-            f.write('\n'.join(html_parts))
         print(f"\n✓ HTML file created: {html_filename}")
         print(f"Summary: {successful_downloads} successful, {failed_downloads} failed")
         print(f"Total time: {elapsed_time:.2f} seconds ({elapsed_time/len(urls):.2f}s per page)")
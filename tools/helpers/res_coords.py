@@ -0,0 +1,71 @@
+"""
+Resfactored sample coords shared by the data comparison scripts.
+
+The comparison scripts (get_maxAbgMF.py, Compare_PLO_SiteInfo.py) all sample the same
+cells: LUTO's grid at a given resfactor, intersected with the coords that already have a
+downloaded siteInfo file. Building these means reading `data/lumap.tif` plus the whole
+download cache, so the result is kept in memory per process and on disk across runs.
+"""
+
+import os
+import xarray as xr
+
+from functools import lru_cache
+from typing import Tuple
+
+from tools import get_downloading_coords, intersect_coords
+from tools.parameter import HIST_SIM_YEAR_START, HIST_SIM_YEAR_END
+from tools.helpers.cache_manager import get_existing_downloads
+
+
+
+@lru_cache(maxsize=None)
+def get_res_coords(
+    resfactor: int = 10,
+    cache_dir: str = 'data/processed'
+) -> Tuple[xr.DataArray, xr.DataArray]:
+    """
+    Get the resfactored coords that have a downloaded siteInfo file.
+
+    Loaded from `{cache_dir}/res_coords_RES_{resfactor}.nc` if it exists, otherwise built
+    and saved there. Delete that file to pick up siteInfo files downloaded since.
+
+    Parameters
+    ----------
+    resfactor : int, optional
+        Resfactor passed to `get_downloading_coords` (default: 10)
+    cache_dir : str, optional
+        Directory holding the cached coords (default: 'data/processed')
+
+    Returns
+    -------
+    res_coords_x : xr.DataArray
+        Longitudes along the 'cell' dimension, ready to use as a `.sel` indexer
+    res_coords_y : xr.DataArray
+        Latitudes along the 'cell' dimension, ready to use as a `.sel` indexer
+    """
+    cache_path = f'{cache_dir}/res_coords_RES_{resfactor}.nc'
+
+    if os.path.exists(cache_path):
+        res_coords = xr.load_dataset(cache_path)
+        return res_coords['x'], res_coords['y']
+
+    # siteInfo records are not filtered by species or scenario, so any valid df filter
+    #   works here; the historical run of specId 8 'Block' is used.
+    with xr.open_dataset("data/data_assembled/siteinfo_cache.nc") as siteinfo_cache:
+        hist_data_year_range = f"{int(siteinfo_cache['year'].min())}_{int(siteinfo_cache['year'].max())}"
+    existing_siteinfo, _, _ = get_existing_downloads(
+        8, 'Block', 'historical', hist_data_year_range, HIST_SIM_YEAR_START, HIST_SIM_YEAR_END
+    )
+
+    scrap_coords = get_downloading_coords(resfactor=resfactor)[['x', 'y']].to_numpy()
+    coords = intersect_coords(existing_siteinfo, scrap_coords)
+
+    res_coords = xr.Dataset({
+        'x': ('cell', coords[:, 0]),
+        'y': ('cell', coords[:, 1]),
+    })
+    os.makedirs(cache_dir, exist_ok=True)
+    res_coords.to_netcdf(cache_path)
+
+    return res_coords['x'], res_coords['y']
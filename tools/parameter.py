@@ -1,3 +1,6 @@
+import re
+
+from types import MappingProxyType
 
 
 RES_FACTOR = 10
@@ -97,19 +100,26 @@ def carbon_csv_name(
     )
 
 
-SPECIES_GEOMETRY = {
-    7:  ['BeltH', 'BlockES', 'Water'],        # 'BeltL' is excluded because LUTO not considering low density belts
-    8:  ['Belt', 'Block'],
-    23: ['BeltHW', 'BlockES'],                # 'BeltL' is excluded; 'BeltHW' is the same as 'BeltH' for Mallee species
-}
+CARBON_CSV_COORDS = re.compile(r'df_(-?\d+\.\d+)_(-?\d+\.\d+)_specId_')
 '''
-This dictionary maps SPECIES_ID to a list of valid SPECIES_CAT values.
+Captures the lon/lat strings of a `carbon_csv_name` filename (or a path ending in one).
+Compiled once for the comparison scripts that parse every downloaded CSV name.
+'''
+
+
+SPECIES_GEOMETRY = MappingProxyType({
+    7:  ('BeltH', 'BlockES', 'Water'),        # 'BeltL' is excluded because LUTO not considering low density belts
+    8:  ('Belt', 'Block'),
+    23: ('BeltHW', 'BlockES'),                # 'BeltL' is excluded; 'BeltHW' is the same as 'BeltH' for Mallee species
+})
+'''
+This read-only mapping maps SPECIES_ID to a tuple of valid SPECIES_CAT values.
 Used for downloading data from the FullCAM REST API for multiple species categories.
 '''
 
 
 
-SPECIES_MAP = {
+SPECIES_MAP = MappingProxyType({
     0: "Acacia Forest and Woodlands",
     1: "Acacia mangium",
     2: "Acacia Open Woodland",
@@ -149,8 +159,8 @@ SPECIES_MAP = {
     48: "Rainforest and vine thickets",
     49: "Tropical Eucalyptus woodlands/grasslands",
     51: "Unclassified Native vegetation",
-}
+})
 '''
-This dictionary maps SPECIES_ID to human-readable species names.
+This read-only mapping maps SPECIES_ID to human-readable species names.
 Used for labeling and interpreting species data in FullCAM analyses.
 '''
\ No newline at end of file